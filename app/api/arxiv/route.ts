@@ -47,7 +47,9 @@ async function searchArXiv(query: string, maxResults: number = 20): Promise<ArXi
 
       if (!idMatch || !titleMatch || !summaryMatch) continue;
 
-      const arxivId = idMatch[1].split('/').pop() || '';
+      // Stored without its version, like the backend's base_arxiv_id, so every
+      // ingest path dedups on the same key (http://arxiv.org/abs/2401.01234v2 -> 2401.01234)
+      const arxivId = (idMatch[1].split('/abs/').pop() || '').replace(/v\d+$/, '');
       const title = titleMatch[1].replace(/<!\[CDATA\[|\]\]>/g, '').trim();
       const summary = summaryMatch[1].replace(/<!\[CDATA\[|\]\]>/g, '').trim();
       const published = publishedMatch ? publishedMatch[1] : '';
@@ -122,10 +124,14 @@ export async function POST(request: NextRequest) {
         // Extract basic keywords from categories
         for (const category of paper.categories) {
           await sql`
-            INSERT INTO keywords (paper_id, keyword, source, confidence, category)
-            SELECT p.id, ${category}, 'arxiv', 1.0, 'category'
-            FROM papers p
-            WHERE p.arxiv_id = ${paper.id}
+            INSERT INTO keyword_vocab (term) VALUES (${category})
+            ON CONFLICT (term) DO NOTHING
+          `;
+          await sql`
+            INSERT INTO keywords (paper_id, keyword_id, source, confidence, category)
+            SELECT p.id, v.id, 'arxiv', 1.0, 'category'
+            FROM papers p, keyword_vocab v
+            WHERE p.arxiv_id = ${paper.id} AND v.term = ${category}
             ON CONFLICT DO NOTHING
           `;
         }
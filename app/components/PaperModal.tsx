@@ -14,6 +14,7 @@ interface Paper {
   pdf_url: string;
   summary_text?: string;
   generated_image_url?: string;
+  image_variants?: Record<string, string>;
 }
 
 interface PaperModalProps {
@@ -47,7 +48,7 @@ export default function PaperModal({ paper, onClose }: PaperModalProps) {
               <div className="mb-6">
                 <div className="relative aspect-video rounded-lg overflow-hidden bg-gray-100">
                   <img
-                    src={paper.generated_image_url}
+                    src={paper.image_variants?.webp ?? paper.generated_image_url}
                     alt={paper.title}
                     className="w-full h-full object-cover"
                   />
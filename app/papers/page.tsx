@@ -19,6 +19,7 @@ interface Paper {
   created_at: string;
   summary_text?: string;
   generated_image_url?: string;
+  image_variants?: Record<string, string>;
 }
 
 export default function PapersPage() {
@@ -66,7 +67,8 @@ export default function PapersPage() {
               return {
                 ...paper,
                 summary_text: summaryData.data.summary_text,
-                generated_image_url: summaryData.data.generated_image_url
+                generated_image_url: summaryData.data.generated_image_url,
+                image_variants: summaryData.data.image_variants
               };
             }
           } catch {
@@ -150,7 +152,7 @@ export default function PapersPage() {
               {paper.generated_image_url && (
                 <div className="aspect-video bg-gray-100 flex items-center justify-center">
                   <img
-                    src={paper.generated_image_url}
+                    src={paper.image_variants?.thumbnail ?? paper.generated_image_url}
                     alt={paper.title}
                     className="w-full h-full object-cover"
                     onError={(e) => {
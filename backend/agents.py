@@ -2,17 +2,47 @@
 LangGraph Agents for HCI Research Trends Platform
 This module contains all the agents for the workflow
 """
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import TypedDict, Annotated, Callable, Iterator, List, Dict, Any, Optional, Tuple
 from langgraph.graph import StateGraph, END
-from datetime import datetime, timedelta
-import arxiv
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langchain_core.runnables import RunnableConfig
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import json
-from database import SessionLocal, Paper, Keyword, Summary, Trend
+import uuid
+from database import SessionLocal, Paper, Keyword, Summary, HarvestWatermark, upsert_papers, insert_summary, paper_row, summary_backlog, image_backlog, get_document_frequencies, add_document_frequencies, intern_terms, bulk_write, rollup_trends
+from harvester import harvest
+from backfill import iter_dump, filter_papers, load_papers
+from keywords import domain_matcher, extract_keywords_batch
+from trends import rescore_trends, week_of
+from grok import grok_client
+from llm_cache import response_cache
+from storage import storage_configured, download, store_file, store_bytes
+from variants import variants_available, variant_pool, make_variants
+from jobqueue import job_queue
+from checkpoints import DatabaseSaver, start_run, finish_run, resumable_run, run_status, record_stage, heartbeat
 import config
 
+def _latest_step(current: str, update: str) -> str:
+    return update
+
+def _merge_errors(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Keep the errors of both branches; a branch that succeeds does not clear the other's"""
+    errors = []
+    for error in (current, update):
+        for part in (error or "").split("; "):
+            if part and part not in errors:
+                errors.append(part)
+    return "; ".join(errors) or None
+
 class AgentState(TypedDict):
-    """State shared between agents"""
+    """
+    State shared between agents
+    The keyword/trend and summary/image branches run in parallel and both
+    update current_step and error, so those keys have reducers; every other
+    key is written by one branch only.
+    """
     papers: List[Dict[str, Any]]
     keywords: List[Dict[str, Any]]
     trends: Dict[str, Any]
@@ -20,8 +50,95 @@ class AgentState(TypedDict):
     images: List[Dict[str, Any]]
     reports: List[str]
     social_posts: List[Dict[str, Any]]
-    current_step: str
-    error: Optional[str]
+    current_step: Annotated[str, _latest_step]
+    error: Annotated[Optional[str], _merge_errors]
+
+class TrendBranchOutput(TypedDict):
+    """Keys the keyword/trend branch hands back to the workflow"""
+    keywords: List[Dict[str, Any]]
+    trends: Dict[str, Any]
+    current_step: Annotated[str, _latest_step]
+    error: Annotated[Optional[str], _merge_errors]
+
+class ContentBranchOutput(TypedDict):
+    """Keys the summary/image branch hands back to the workflow"""
+    summaries: List[Dict[str, Any]]
+    images: List[Dict[str, Any]]
+    current_step: Annotated[str, _latest_step]
+    error: Annotated[Optional[str], _merge_errors]
+
+def _store_new_papers(db, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Store a page of papers using one lookup and one bulk insert.
+    Returns only the papers that were newly inserted, with their ids set.
+    """
+    if not page:
+        return []
+    
+    # One set-based query for every arxiv_id on the page
+    arxiv_ids = {paper['arxiv_id'] for paper in page}
+    existing = {
+        arxiv_id for (arxiv_id,) in
+        db.query(Paper.arxiv_id).filter(Paper.arxiv_id.in_(arxiv_ids))
+    }
+    
+    new_papers = {}
+    for paper in page:
+        if paper['arxiv_id'] not in existing:
+            new_papers.setdefault(paper['arxiv_id'], paper)
+    
+    # ON CONFLICT DO NOTHING covers papers inserted by a concurrent run
+    inserted = upsert_papers(db, [paper_row(paper) for paper in new_papers.values()])
+    db.commit()
+    
+    stored = []
+    for arxiv_id, paper in new_papers.items():
+        if arxiv_id in inserted:
+            paper['id'] = inserted[arxiv_id]
+            stored.append(paper)
+    return stored
+
+def _watermark_stop_points(db) -> Dict[str, Any]:
+    """
+    Where each category's harvest should stop: its stored watermark,
+    or ARXIV_DAYS_BACK ago for a category that has never been harvested.
+    """
+    watermarks = {
+        w.category: (w.last_submitted, w.last_arxiv_id)
+        for w in db.query(HarvestWatermark).filter(HarvestWatermark.category.in_(config.ARXIV_CATEGORIES))
+    }
+    first_run_stop = (datetime.utcnow() - timedelta(days=config.ARXIV_DAYS_BACK), '')
+    return {category: watermarks.get(category, first_run_stop) for category in config.ARXIV_CATEGORIES}
+
+def _advance_watermark(db, category: str, newest):
+    """Move a category's watermark up to the newest (submitted, arxiv_id) harvested"""
+    watermark = db.query(HarvestWatermark).filter(HarvestWatermark.category == category).first()
+    if watermark is None:
+        watermark = HarvestWatermark(category=category)
+        db.add(watermark)
+    watermark.last_submitted, watermark.last_arxiv_id = newest
+    db.commit()
+
+def _harvest_new_papers(db) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Harvest every category up to its watermark and yield each page's newly
+    stored papers as soon as the page is stored
+    """
+    # Categories are fetched concurrently; pages are stored as they stream in
+    counts = {category: 0 for category in config.ARXIV_CATEGORIES}
+    for kind, category, payload in harvest(_watermark_stop_points(db)):
+        if kind == 'page':
+            new_papers = _store_new_papers(db, payload)
+            counts[category] += len(new_papers)
+            if new_papers:
+                yield new_papers
+        elif kind == 'done':
+            if payload is not None:
+                _advance_watermark(db, category, payload)
+            print(f"🔍 {category}: {counts[category]} new papers")
+        else:
+            # Watermark is left untouched, so the next run retries this category
+            print(f"⚠️  Error harvesting {category}: {payload}")
 
 def arxiv_search_agent(state: AgentState) -> AgentState:
     """
@@ -32,59 +149,8 @@ def arxiv_search_agent(state: AgentState) -> AgentState:
     try:
         db = SessionLocal()
         papers = []
-        
-        # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=config.ARXIV_DAYS_BACK)
-        
-        # Search ArXiv for each category
-        search_query = (
-            "cat:cs.HC OR cat:cs.AI OR cat:cs.CY "
-            "AND (HCI OR human-computer interaction OR user interface OR UX)"
-        )
-        
-        search = arxiv.Search(
-            query=search_query,
-            max_results=config.ARXIV_MAX_RESULTS,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending
-        )
-        
-        for result in search.results():
-            # Check if paper already exists
-            existing = db.query(Paper).filter(Paper.arxiv_id == result.entry_id.split('/')[-1]).first()
-            if existing:
-                continue
-            
-            paper_data = {
-                'arxiv_id': result.entry_id.split('/')[-1],
-                'title': result.title,
-                'authors': [author.name for author in result.authors],
-                'abstract': result.summary,
-                'categories': result.categories,
-                'published_date': result.published.date(),
-                'arxiv_url': result.entry_id,
-                'pdf_url': result.pdf_url
-            }
-            
-            # Store in database
-            paper = Paper(
-                arxiv_id=paper_data['arxiv_id'],
-                title=paper_data['title'],
-                authors=paper_data['authors'],
-                abstract=paper_data['abstract'],
-                arxiv_categories=paper_data['categories'],
-                published_date=paper_data['published_date'],
-                arxiv_url=paper_data['arxiv_url'],
-                pdf_url=paper_data['pdf_url']
-            )
-            db.add(paper)
-            db.commit()
-            db.refresh(paper)
-            
-            paper_data['id'] = paper.id
-            papers.append(paper_data)
-        
+        for page in _harvest_new_papers(db):
+            papers.extend(page)
         db.close()
         
         state['papers'] = papers
@@ -99,6 +165,36 @@ def arxiv_search_agent(state: AgentState) -> AgentState:
     
     return state
 
+def _store_keywords(db, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Extract, store and return the keywords of a batch of stored papers"""
+    # Domain vocabulary is compiled once per process
+    matcher = domain_matcher()
+    
+    # Score the whole batch at once against corpus-wide document frequencies
+    keywords, batch_frequencies = extract_keywords_batch(
+        papers,
+        matcher,
+        lambda terms: get_document_frequencies(db, terms)
+    )
+    
+    # One bulk write for the whole batch, storing interned keyword ids
+    if keywords:
+        term_ids = intern_terms({k['keyword'] for k in keywords})
+        bulk_write(db, Keyword, [
+            {
+                'paper_id': k['paper_id'],
+                'keyword_id': term_ids[k['keyword']],
+                'source': k['source'],
+                'confidence': k['confidence'],
+                'category': k['category']
+            }
+            for k in keywords
+        ])
+    add_document_frequencies(db, batch_frequencies, len(papers))
+    
+    db.commit()
+    return keywords
+
 def keyword_extraction_agent(state: AgentState) -> AgentState:
     """
     Agent 2: Extract keywords from papers using NLP techniques
@@ -107,79 +203,7 @@ def keyword_extraction_agent(state: AgentState) -> AgentState:
     
     try:
         db = SessionLocal()
-        keywords = []
-        
-        # Stop words to exclude
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-            'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these',
-            'those', 'we', 'our', 'us', 'they', 'their', 'them', 'it', 'its',
-            'which', 'who', 'what', 'where', 'when', 'how', 'why', 'paper',
-            'study', 'research', 'approach', 'method', 'propose', 'present',
-            'show', 'demonstrate', 'results', 'using', 'based', 'novel'
-        }
-        
-        for paper in state['papers']:
-            # Extract meaningful phrases from abstract
-            text = paper['abstract'].lower()
-            
-            # Important HCI and AI domain terms (multi-word phrases first)
-            domain_terms = [
-                # AI/ML terms
-                'machine learning', 'deep learning', 'neural network', 'reinforcement learning',
-                'transfer learning', 'federated learning', 'large language model', 'generative ai',
-                'computer vision', 'natural language processing', 'speech recognition',
-                'knowledge graph', 'diffusion model', 'transformer', 'attention mechanism',
-                
-                # HCI terms
-                'user interface', 'user experience', 'interaction design', 'usability',
-                'accessibility', 'human-computer interaction', 'user study', 'user behavior',
-                'augmented reality', 'virtual reality', 'mixed reality', 'extended reality',
-                'gesture recognition', 'eye tracking', 'haptic feedback', 'multimodal interaction',
-                
-                # Application domains
-                'healthcare', 'education', 'robotics', 'autonomous systems', 'iot',
-                'cybersecurity', 'privacy', 'explainability', 'interpretability', 'fairness',
-                'bias', 'ethics', 'sustainability', 'accessibility'
-            ]
-            
-            # Extract domain terms found in abstract
-            extracted_terms = set()
-            for term in domain_terms:
-                if term in text:
-                    extracted_terms.add(term)
-            
-            # Extract significant single words (nouns, adjectives, verbs)
-            words = text.replace(',', ' ').replace('.', ' ').replace('(', ' ').replace(')', ' ').split()
-            word_freq = {}
-            
-            for word in words:
-                word = word.strip()
-                # Keep words that are 4+ chars, not stop words, and alphanumeric
-                if len(word) >= 4 and word not in stop_words and word.isalpha():
-                    word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # Get top single-word keywords (frequency > 1)
-            for word, freq in sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]:
-                if freq > 1:  # Only words appearing multiple times
-                    extracted_terms.add(word)
-            
-            # Store extracted keywords
-            for term in extracted_terms:
-                keyword_data = {
-                    'paper_id': paper['id'],
-                    'keyword': term,
-                    'source': 'nlp_extracted',
-                    'confidence': 0.9,
-                    'category': 'topic'
-                }
-                keyword = Keyword(**keyword_data)
-                db.add(keyword)
-                keywords.append(keyword_data)
-        
-        db.commit()
+        keywords = _store_keywords(db, state['papers'])
         db.close()
         
         state['keywords'] = keywords
@@ -192,6 +216,61 @@ def keyword_extraction_agent(state: AgentState) -> AgentState:
     
     return state
 
+def _update_trends(db, keyword_counts: Dict[Tuple[date, str], int]) -> Dict[str, Dict[str, Any]]:
+    """
+    Add (week_start, keyword) counts into the weekly trends and return the
+    rescored keywords, as of the latest week the counts touch
+    """
+    weeks: Dict[date, Dict[str, int]] = {}
+    for (week_start, keyword), count in keyword_counts.items():
+        weeks.setdefault(week_start, {})[keyword] = count
+    if not weeks:
+        return {}
+    term_ids = intern_terms({keyword for _, keyword in keyword_counts})
+    
+    # Add this run's counts into each week's rollup
+    keyword_ids = set()
+    for week_start, counts in weeks.items():
+        totals = rollup_trends(
+            db,
+            week_start,
+            {term_ids[keyword]: count for keyword, count in counts.items()}
+        )
+        keyword_ids.update(totals)
+    
+    # Rescore the batch's keywords over their whole history in one vectorized
+    # pass; only rows from the earliest week touched onwards are written back
+    first_week, last_week = min(weeks), max(weeks)
+    span = (last_week - first_week).days // 7 + 1
+    current = rescore_trends(
+        db,
+        last_week=last_week,
+        weeks=max(config.TREND_WINDOW_WEEKS, span),
+        keyword_ids=keyword_ids,
+        write_from=first_week
+    )
+    # Later weeks' scores depend on the weeks just updated
+    current_week = week_of(datetime.now().date())
+    if last_week < current_week:
+        rescore_trends(
+            db,
+            last_week=current_week,
+            weeks=max(config.TREND_WINDOW_WEEKS, (current_week - first_week).days // 7 + 1),
+            keyword_ids=keyword_ids,
+            write_from=last_week + timedelta(weeks=1)
+        )
+    db.commit()
+    
+    trends_data = {}
+    for keyword in term_ids:
+        stats = current[term_ids[keyword]]
+        trends_data[keyword] = {
+            'frequency': stats['frequency'],
+            'trending_score': stats['trending_score'],
+            'growth_rate': stats['growth_rate']
+        }
+    return trends_data
+
 def trend_analysis_agent(state: AgentState) -> AgentState:
     """
     Agent 3: Calculate trending keywords
@@ -201,50 +280,15 @@ def trend_analysis_agent(state: AgentState) -> AgentState:
     try:
         db = SessionLocal()
         
-        # Get current week start
-        today = datetime.now().date()
-        week_start = today - timedelta(days=today.weekday())
-        
-        # Count keyword frequencies for this week
+        # Count keyword frequencies in each paper's published week, the same
+        # buckets recompute.py rebuilds
+        weeks = {paper['id']: week_of(paper['published_date']) for paper in state['papers']}
         keyword_counts = {}
         for keyword in state['keywords']:
-            kw = keyword['keyword']
-            keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
-        
-        # Calculate trending scores
-        trends_data = {}
-        for keyword, frequency in keyword_counts.items():
-            # Simple trending score: frequency * recency weight
-            trending_score = frequency * 1.5  # Boost new items
-            
-            # Get historical data
-            historical = db.query(Trend).filter(
-                Trend.keyword == keyword,
-                Trend.week_start < week_start
-            ).order_by(Trend.week_start.desc()).first()
-            
-            growth_rate = 0.0
-            if historical is not None:
-                if historical.frequency > 0:
-                    growth_rate = ((frequency - historical.frequency) / historical.frequency) * 100
-            
-            # Store trend
-            trend = Trend(
-                keyword=keyword,
-                week_start=week_start,
-                frequency=frequency,
-                trending_score=trending_score,
-                growth_rate=growth_rate
-            )
-            db.add(trend)
-            
-            trends_data[keyword] = {
-                'frequency': frequency,
-                'trending_score': trending_score,
-                'growth_rate': growth_rate
-            }
+            key = (weeks[keyword['paper_id']], keyword['keyword'])
+            keyword_counts[key] = keyword_counts.get(key, 0) + 1
         
-        db.commit()
+        trends_data = _update_trends(db, keyword_counts)
         db.close()
         
         state['trends'] = trends_data
@@ -257,6 +301,178 @@ def trend_analysis_agent(state: AgentState) -> AgentState:
     
     return state
 
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that explains research to students."
+
+SUMMARY_PROMPT = """
+            Write a concise executive summary of this research paper for undergraduate students in 150 words.
+            Structure it as follows:
+            - Problem/Background: What challenge does this address?
+            - Solution/Approach: What method or innovation is proposed?
+            - Key Findings: What are the main results?
+            - Impact: Why does this matter?
+            
+            Use clear, professional language that is accessible to undergraduates.
+            Avoid jargon but maintain academic rigor.
+            
+            Title: {title}
+            Abstract: {abstract}
+            
+            Executive Summary:
+            """
+
+SUMMARY_BATCH_PROMPT = """
+            Write a concise executive summary of each research paper below for undergraduate students, 150 words each.
+            Structure each summary as follows:
+            - Problem/Background: What challenge does this address?
+            - Solution/Approach: What method or innovation is proposed?
+            - Key Findings: What are the main results?
+            - Impact: Why does this matter?
+            
+            Use clear, professional language that is accessible to undergraduates.
+            Avoid jargon but maintain academic rigor.
+            
+            Respond with JSON only, in the form {{"summaries": [{{"id": "<paper id>", "summary": "<executive summary>"}}]}},
+            with exactly one entry per paper and the ids exactly as given.
+            
+{papers}
+            """
+
+SUMMARY_BATCH_PAPER = """
+            Paper id: {arxiv_id}
+            Title: {title}
+            Abstract: {abstract}
+"""
+
+SUMMARY_BATCH_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "paper_summaries",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "summaries": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "string"}, "summary": {"type": "string"}},
+                        "required": ["id", "summary"]
+                    }
+                }
+            },
+            "required": ["summaries"]
+        }
+    }
+}
+
+def _generate_summary(paper: Dict[str, Any]) -> str:
+    """Summarize one paper; runs on a worker thread"""
+    return grok_client().chat(
+        [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": SUMMARY_PROMPT.format(title=paper['title'], abstract=paper['abstract'])}
+        ],
+        max_tokens=250,
+        temperature=0.7
+    )
+
+def _parse_batch_summaries(content: str, arxiv_ids: List[str]) -> Dict[str, str]:
+    """
+    Validate a batched response and return {arxiv_id: summary} for every
+    well-formed entry. Raises ValueError if the response is not the expected
+    JSON shape; unknown ids and empty summaries are dropped.
+    """
+    data = json.loads(content)
+    if not isinstance(data, dict) or not isinstance(data.get('summaries'), list):
+        raise ValueError("response has no 'summaries' list")
+
+    expected = set(arxiv_ids)
+    summaries = {}
+    for entry in data['summaries']:
+        if not isinstance(entry, dict):
+            continue
+        arxiv_id, summary_text = entry.get('id'), entry.get('summary')
+        if arxiv_id in expected and isinstance(summary_text, str) and summary_text.strip():
+            summaries[arxiv_id] = summary_text.strip()
+    return summaries
+
+def _generate_batch_summaries(papers: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Summarize several papers in one structured-output request"""
+    prompt = SUMMARY_BATCH_PROMPT.format(papers="".join(
+        SUMMARY_BATCH_PAPER.format(arxiv_id=paper['arxiv_id'], title=paper['title'], abstract=paper['abstract'])
+        for paper in papers
+    ))
+    arxiv_ids = [paper['arxiv_id'] for paper in papers]
+    # A malformed response raises before it is cached, so a retry asks again
+    content = grok_client().chat(
+        [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=300 * len(papers),
+        temperature=0.7,
+        response_format=SUMMARY_BATCH_SCHEMA,
+        validate=lambda content: _parse_batch_summaries(content, arxiv_ids)
+    )
+    return _parse_batch_summaries(content, arxiv_ids)
+
+def _summarize_papers(papers: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional[str], Optional[str]]]:
+    """
+    Summarize a group of papers; runs on a worker thread. Groups of more than
+    one paper share a single batched request, and any paper the batched
+    response does not cover falls back to its own request.
+    Returns (paper, summary_text, error) for each paper.
+    """
+    summaries = {}
+    if len(papers) > 1:
+        try:
+            summaries = _generate_batch_summaries(papers)
+        except Exception as e:
+            print(f"⚠️  Batched summary request for {len(papers)} papers failed: {str(e)}")
+        missing = len(papers) - len(summaries)
+        if missing:
+            print(f"   Falling back to per-paper requests for {missing} papers")
+
+    results = []
+    for paper in papers:
+        summary_text = summaries.get(paper['arxiv_id'])
+        if summary_text is None:
+            try:
+                summary_text = _generate_summary(paper)
+            except Exception as e:
+                results.append((paper, None, str(e)))
+                continue
+        results.append((paper, summary_text, None))
+    return results
+
+def _store_summary(db, paper: Dict[str, Any], summary_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Save a generated summary and return it as recorded in the agent state.
+    Returns None if the paper already has a summary (e.g. stored by a queue
+    worker whose lease on the same job had expired).
+    """
+    word_count = len(summary_text.split())
+    inserted = insert_summary(db, {
+        'paper_id': paper['id'],
+        'summary_text': summary_text,
+        'word_count': word_count,
+        'difficulty_level': 'undergraduate',
+        'created_at': datetime.utcnow()
+    })
+    db.commit()
+    if not inserted:
+        return None
+    return {'paper_id': paper['id'], 'summary_text': summary_text, 'word_count': word_count}
+
+def _enqueue_summary_backlog(db, queue) -> int:
+    """Queue one summary job per paper without a summary; returns how many were queued"""
+    queued, after = 0, None
+    while True:
+        page = summary_backlog(db, config.SUMMARY_BACKLOG_PAGE_SIZE, after)
+        if not page:
+            return queued
+        after = (page[-1]['published_date'], page[-1]['id'])
+        queued += queue.enqueue('summary', [(str(paper['id']), {'paper_id': paper['id']}) for paper in page])
+
 def summary_generation_agent(state: AgentState) -> AgentState:
     """
     Agent 4: Generate student-friendly summaries using Grok API
@@ -273,99 +489,53 @@ def summary_generation_agent(state: AgentState) -> AgentState:
             state['current_step'] = 'summaries_generated'
             return state
         
-        headers = {
-            "Authorization": f"Bearer {config.GROK_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        # Process only papers without summaries (incremental processing)
-        papers_to_process = []
-        for paper in state['papers']:
-            existing_summary = db.query(Summary).filter(Summary.paper_id == paper['id']).first()
-            if not existing_summary:
-                papers_to_process.append(paper)
-        
-        # Limit to 10 papers per run to avoid timeouts
-        papers_to_process = papers_to_process[:10]
-        print(f"📝 Processing {len(papers_to_process)} papers without summaries")
+        queue = job_queue()
+        if queue is not None:
+            # Queue workers (worker.py) generate the summaries and their images
+            queued = _enqueue_summary_backlog(db, queue)
+            db.close()
+            state['summaries'] = []
+            state['current_step'] = 'summaries_generated'
+            print(f"✅ Summary Generation Agent: Queued {queued} summary jobs ({config.QUEUE_BACKEND} queue)")
+            return state
         
-        for paper in papers_to_process:
-            prompt = f"""
-            Write a concise executive summary of this research paper for undergraduate students in 150 words.
-            Structure it as follows:
-            - Problem/Background: What challenge does this address?
-            - Solution/Approach: What method or innovation is proposed?
-            - Key Findings: What are the main results?
-            - Impact: Why does this matter?
-            
-            Use clear, professional language that is accessible to undergraduates.
-            Avoid jargon but maintain academic rigor.
-            
-            Title: {paper['title']}
-            Abstract: {paper['abstract']}
-            
-            Executive Summary:
-            """
-            
-            # Try up to 3 times with longer timeout
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    response = requests.post(
-                        f"{config.GROK_API_BASE_URL}/chat/completions",
-                        headers=headers,
-                        json={
-                            "model": config.GROK_MODEL_TEXT,
-                            "messages": [
-                                {"role": "system", "content": "You are a helpful assistant that explains research to students."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            "max_tokens": 250,
-                            "temperature": 0.7
-                        },
-                        timeout=60  # Increased to 60 seconds
-                    )
-                    
-                    if response.status_code == 200:
-                        summary_text = response.json()['choices'][0]['message']['content']
-                        word_count = len(summary_text.split())
-                        
-                        summary = Summary(
-                            paper_id=paper['id'],
-                            summary_text=summary_text,
-                            word_count=word_count,
-                            difficulty_level='undergraduate'
-                        )
-                        db.add(summary)
-                        db.commit()
-                        
-                        summaries.append({
-                            'paper_id': paper['id'],
-                            'summary_text': summary_text,
-                            'word_count': word_count
-                        })
-                        print(f"✅ Generated summary for paper {paper['arxiv_id']}")
-                        break  # Success, exit retry loop
-                    else:
-                        print(f"⚠️  API returned status {response.status_code} for paper {paper['arxiv_id']}")
-                        if attempt < max_retries - 1:
-                            print(f"   Retrying... ({attempt + 2}/{max_retries})")
-                            continue
-                        
-                except Exception as e:
-                    print(f"⚠️  Error generating summary for paper {paper['arxiv_id']}: {str(e)}")
-                    if attempt < max_retries - 1:
-                        print(f"   Retrying... ({attempt + 2}/{max_retries})")
-                        continue
-                    else:
-                        print(f"   Failed after {max_retries} attempts, skipping...")
-                        break
+        # The backlog is every paper without a summary, not just this run's
+        # papers, so earlier failures are retried; it is read in keyset pages
+        batch_size = max(1, config.SUMMARY_BATCH_SIZE)
+        print(f"📝 Processing papers without summaries in pages of {config.SUMMARY_BACKLOG_PAGE_SIZE} "
+              f"({batch_size} per request, {config.GROK_CONCURRENCY} concurrent requests)")
+        
+        def backlog_results(pool):
+            after = None
+            while True:
+                page = summary_backlog(db, config.SUMMARY_BACKLOG_PAGE_SIZE, after)
+                if not page:
+                    return
+                after = (page[-1]['published_date'], page[-1]['id'])
+                batches = [page[i:i + batch_size] for i in range(0, len(page), batch_size)]
+                for future in as_completed([pool.submit(_summarize_papers, batch) for batch in batches]):
+                    yield from future.result()
+        
+        # Requests run on a thread pool; results are written from this thread,
+        # since the session is not shared with the workers
+        with ThreadPoolExecutor(max_workers=config.GROK_CONCURRENCY) as pool:
+            for paper, summary_text, error in backlog_results(pool):
+                if error is not None:
+                    print(f"⚠️  Error generating summary for paper {paper['arxiv_id']}: {error}")
+                    continue
+                
+                summary = _store_summary(db, paper, summary_text)
+                if summary is not None:
+                    summaries.append(summary)
+                    print(f"✅ Generated summary for paper {paper['arxiv_id']}")
         
         db.close()
         
         state['summaries'] = summaries
         state['current_step'] = 'summaries_generated'
         print(f"✅ Summary Generation Agent: Created {len(summaries)} summaries")
+        if response_cache() is not None:
+            print(f"   LLM cache: {response_cache().stats()}")
         
     except Exception as e:
         print(f"❌ Summary Generation Agent Error: {str(e)}")
@@ -373,6 +543,98 @@ def summary_generation_agent(state: AgentState) -> AgentState:
     
     return state
 
+IMAGE_PROMPT = """Create a clean, modern, minimalist illustration representing this research concept:
+            
+Title: {title}
+Summary: {summary}
+
+Style: Flat design, vibrant colors, simple geometric shapes, tech/futuristic theme, suitable for academic presentation"""
+
+IMAGE_EXTENSIONS = {'image/png': 'png', 'image/webp': 'webp', 'image/jpeg': 'jpeg'}
+
+def _create_image(item: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, str]], bool]:
+    """
+    Generate one image, store it and its variants under content-hash keys;
+    runs on a worker thread. Returns the URL to record, the variant URLs, and
+    whether the URL is permanent (stored). Falls back to the provider's
+    temporary URL if storing the original fails; variants that fail are left
+    out. A cached generation whose URL no longer
+    downloads is generated again, so an expired URL is never recorded.
+    """
+    visual_prompt = IMAGE_PROMPT.format(title=item['title'], summary=item['summary_text'][:200])
+    print(f"🎨 Generating image for paper: {item['arxiv_id']}")
+    
+    # Served from the response cache when this prompt was generated before,
+    # unless the temporary URL itself is what gets recorded
+    refresh = not storage_configured()
+    while True:
+        result = grok_client().generate_image(visual_prompt, refresh=refresh)
+        
+        # Format: {"data": [{"url": "https://..."}, ...]}
+        image_data = (result.get('data') or [{}])[0]
+        image_url = image_data.get('url')
+        if not image_url:
+            grok_client().forget_image(visual_prompt)
+            if 'b64_json' in image_data:
+                print(f"⚠️  Image returned as base64, not storing (need to upload to storage)")
+                return None, None, False
+            raise ValueError(f"could not extract image URL from response keys {list(result.keys())}")
+        
+        if not storage_configured():
+            print(f"⚠️  R2 credentials not set, storing temporary URL")
+            return image_url, None, False
+        
+        try:
+            source, digest, content_type = download(image_url)
+            break
+        except requests.HTTPError as e:
+            print(f"⚠️  Failed to download image: {str(e)}")
+            # Generation URLs are temporary; do not serve this one from the cache again
+            grok_client().forget_image(visual_prompt)
+            if refresh:
+                return image_url, None, False
+            # Possibly an expired URL from the cache: generate a new image
+            refresh = True
+    
+    try:
+        with source:
+            # Encoding is CPU-bound and runs in the variant process pool,
+            # overlapping with the upload of the original
+            encoding = variant_pool().submit(make_variants, source.read()) if variants_available() else None
+            source.seek(0)
+            permanent_url = store_file(source, digest, IMAGE_EXTENSIONS.get(content_type, 'jpeg'), content_type)
+    except Exception as e:
+        print(f"⚠️  Error uploading image: {str(e)}")
+        return image_url, None, False
+    
+    # The original is stored; variants that fail to encode or upload are left out
+    variant_urls = {'original': permanent_url}
+    if encoding is not None:
+        try:
+            for name, (data, extension) in encoding.result().items():
+                variant_urls[name] = store_bytes(data, extension)
+        except Exception as e:
+            print(f"⚠️  Error storing image variants for paper {item['arxiv_id']}: {str(e)}")
+            variant_urls = {'original': permanent_url}
+    return permanent_url, variant_urls, True
+
+def _store_image(db, item: Dict[str, Any], image_url: str, variant_urls: Optional[Dict[str, str]]):
+    """Record the image URL and variant URLs on the summary"""
+    db.query(Summary).filter(Summary.id == item['summary_id']).update(
+        {Summary.generated_image_url: image_url, Summary.image_variants: variant_urls}
+    )
+    db.commit()
+
+def _enqueue_image_backlog(db, queue) -> int:
+    """Queue one image job per paper whose summary has no image; returns how many were queued"""
+    queued, after = 0, 0
+    while True:
+        page = image_backlog(db, config.IMAGE_BACKLOG_PAGE_SIZE, after)
+        if not page:
+            return queued
+        after = page[-1]['summary_id']
+        queued += queue.enqueue('image', [(str(item['paper_id']), {'paper_id': item['paper_id']}) for item in page])
+
 def image_creation_agent(state: AgentState) -> AgentState:
     """
     Agent 5: Generate images using Grok-2-Image-1212
@@ -389,171 +651,50 @@ def image_creation_agent(state: AgentState) -> AgentState:
             state['current_step'] = 'images_created'
             return state
         
-        headers = {
-            "Authorization": f"Bearer {config.GROK_API_KEY}",
-            "Content-Type": "application/json"
-        }
+        queue = job_queue()
+        if queue is not None:
+            queued = _enqueue_image_backlog(db, queue)
+            db.close()
+            state['images'] = []
+            state['current_step'] = 'images_created'
+            print(f"✅ Image Creation Agent: Queued {queued} image jobs ({config.QUEUE_BACKEND} queue)")
+            return state
         
         # Generate images for papers with summaries but no images yet (incremental)
-        summaries_without_images = db.query(Summary).filter(Summary.generated_image_url == None).limit(5).all()
-        print(f"🎨 Processing {len(summaries_without_images)} summaries without images")
-        
-        for summary in summaries_without_images:
-            # Get the paper for this summary
-            paper = db.query(Paper).filter(Paper.id == summary.paper_id).first()
-            if not paper:
-                print(f"⚠️  Paper not found for summary {summary.paper_id}")
-                continue
-            
-            paper_dict = {
-                'id': paper.id,
-                'arxiv_id': paper.arxiv_id,
-                'title': paper.title
-            }
-            
-            # Create visual prompt from paper
-            visual_prompt = f"""Create a clean, modern, minimalist illustration representing this research concept:
-            
-Title: {paper_dict['title']}
-Summary: {summary.summary_text[:200]}
-
-Style: Flat design, vibrant colors, simple geometric shapes, tech/futuristic theme, suitable for academic presentation"""
-            
-            print(f"🎨 Generating image for paper: {paper_dict['arxiv_id']}")
-            
-            # Try up to 2 times
-            max_retries = 2
-            for attempt in range(max_retries):
+        print(f"🎨 Processing summaries without images ({config.IMAGE_WORKERS} workers)")
+        
+        def backlog_results(pool):
+            after = 0
+            while True:
+                page = image_backlog(db, config.IMAGE_BACKLOG_PAGE_SIZE, after)
+                if not page:
+                    return
+                after = page[-1]['summary_id']
+                futures = {pool.submit(_create_image, item): item for item in page}
+                for future in as_completed(futures):
+                    yield futures[future], future
+        
+        # Each worker runs generation, download and upload for one image, so the
+        # stages overlap across images; results are written from this thread
+        with ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS) as pool:
+            for item, future in backlog_results(pool):
                 try:
-                    # Use the correct images/generations endpoint for Grok image model
-                    response = requests.post(
-                        f"{config.GROK_API_BASE_URL}/images/generations",
-                        headers=headers,
-                        json={
-                            "model": config.GROK_MODEL_IMAGE,
-                            "prompt": visual_prompt,
-                            "n": 1
-                        },
-                        timeout=120  # Image generation can take longer
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        print(f"📥 Image API response keys: {list(result.keys())}")
-                        
-                        # Extract image URL from images API response
-                        # Format: {"data": [{"url": "https://..."}, ...]}
-                        image_url = None
-                        
-                        if 'data' in result and isinstance(result['data'], list) and len(result['data']) > 0:
-                            image_data = result['data'][0]
-                            if 'url' in image_data:
-                                image_url = image_data['url']
-                            elif 'b64_json' in image_data:
-                                # Handle base64 format if returned
-                                print(f"⚠️  Image returned as base64, not storing (need to upload to storage)")
-                                image_url = None
-                        
-                        # Update summary with image URL
-                        if image_url:
-                            # Download the image and upload to Cloudflare R2 for permanent hosting
-                            try:
-                                print(f"📥 Downloading image from {image_url[:50]}...")
-                                img_response = requests.get(image_url, timeout=30)
-                                if img_response.status_code == 200:
-                                    # Upload to Cloudflare R2 for permanent hosting
-                                    if config.R2_ACCOUNT_ID and config.R2_ACCESS_KEY_ID and config.R2_SECRET_ACCESS_KEY and config.R2_BUCKET_NAME:
-                                        import boto3
-                                        from botocore.client import Config as BotoConfig
-                                        
-                                        print(f"📤 Uploading to Cloudflare R2...")
-                                        
-                                        # Create S3 client for R2
-                                        s3_client = boto3.client(
-                                            's3',
-                                            endpoint_url=f'https://{config.R2_ACCOUNT_ID}.r2.cloudflarestorage.com',
-                                            aws_access_key_id=config.R2_ACCESS_KEY_ID,
-                                            aws_secret_access_key=config.R2_SECRET_ACCESS_KEY,
-                                            config=BotoConfig(signature_version='s3v4'),
-                                            region_name='auto'
-                                        )
-                                        
-                                        # Generate unique filename
-                                        import hashlib
-                                        from datetime import datetime as dt
-                                        filename = f"papers/{paper_dict['arxiv_id']}-{hashlib.md5(paper_dict['title'].encode()).hexdigest()[:8]}.jpeg"
-                                        
-                                        # Upload to R2
-                                        s3_client.put_object(
-                                            Bucket=config.R2_BUCKET_NAME,
-                                            Key=filename,
-                                            Body=img_response.content,
-                                            ContentType='image/jpeg',
-                                            ACL='public-read'
-                                        )
-                                        
-                                        # Construct public URL
-                                        if config.R2_PUBLIC_URL:
-                                            permanent_url = f"{config.R2_PUBLIC_URL}/{filename}"
-                                        else:
-                                            permanent_url = f"https://{config.R2_BUCKET_NAME}.{config.R2_ACCOUNT_ID}.r2.cloudflarestorage.com/{filename}"
-                                        
-                                        summary.generated_image_url = permanent_url
-                                        db.commit()
-                                        
-                                        images.append({
-                                            'paper_id': paper_dict['id'],
-                                            'image_url': permanent_url
-                                        })
-                                        print(f"✅ Uploaded to R2 for paper {paper_dict['arxiv_id']}: {permanent_url}")
-                                    else:
-                                        # No R2 configured, store original URL
-                                        print(f"⚠️  R2 credentials not set, storing temporary URL")
-                                        summary.generated_image_url = image_url
-                                        db.commit()
-                                else:
-                                    print(f"⚠️  Failed to download image: HTTP {img_response.status_code}")
-                                    summary.generated_image_url = image_url
-                                    db.commit()
-                            except Exception as upload_error:
-                                print(f"⚠️  Error uploading image: {str(upload_error)}")
-                                import traceback
-                                traceback.print_exc()
-                                # Store original URL as fallback
-                                summary.generated_image_url = image_url
-                                db.commit()
-                        else:
-                            print(f"⚠️  Could not extract image URL from response for paper {paper_dict['arxiv_id']}")
-                            print(f"   Response structure: {list(result.keys())}")
-                        
-                        break  # Success, exit retry loop
-                    else:
-                        error_msg = response.text if response.text else "No error message"
-                        print(f"⚠️  Image API returned status {response.status_code} for paper {paper_dict['arxiv_id']}")
-                        print(f"   Full error response: {error_msg}")
-                        print(f"   Request URL: {config.GROK_API_BASE_URL}/images/generations")
-                        print(f"   Request model: {config.GROK_MODEL_IMAGE}")
-                        print(f"   Request payload: {{'model': '{config.GROK_MODEL_IMAGE}', 'prompt': '...', 'n': 1, 'size': '1024x1024'}}")
-                        
-                        # Try to parse error details
-                        try:
-                            error_json = response.json()
-                            print(f"   Error details: {error_json}")
-                        except:
-                            pass
-                        
-                        if attempt < max_retries - 1:
-                            print(f"   Retrying... ({attempt + 2}/{max_retries})")
-                            continue
-                        
+                    image_url, variant_urls, permanent = future.result()
                 except Exception as e:
-                    print(f"⚠️  Error generating image for paper {paper_dict['arxiv_id']}: {str(e)}")
-                    if attempt < max_retries - 1:
-                        print(f"   Retrying... ({attempt + 2}/{max_retries})")
-                        continue
-                    else:
-                        print(f"   Failed after {max_retries} attempts, skipping...")
-                        break
+                    print(f"⚠️  Error generating image for paper {item['arxiv_id']}: {str(e)}")
+                    continue
+                if image_url is None:
+                    continue
+                
+                _store_image(db, item, image_url, variant_urls)
+                
+                if permanent:
+                    images.append({
+                        'paper_id': item['paper_id'],
+                        'image_url': image_url,
+                        'variants': variant_urls
+                    })
+                    print(f"✅ Uploaded to R2 for paper {item['arxiv_id']}: {image_url}")
         
         db.close()
         
@@ -643,39 +784,126 @@ def social_media_agent(state: AgentState) -> AgentState:
     
     return state
 
+class StageError(RuntimeError):
+    """An agent reported an error; the run stops at its node so a resume retries it"""
+
+def _node(agent: Callable[[AgentState], AgentState]) -> Callable[[AgentState, RunnableConfig], Dict[str, Any]]:
+    """
+    Wrap an agent as a graph node that returns only the keys it changed.
+    Agents update the state in place and return all of it; passing that on
+    would make parallel nodes write every key at once.
+    
+    In a checkpointed run the node also records its stage, and an error the
+    agent reports fails the node instead of being passed on, so resuming the
+    run starts again from this node.
+    """
+    def node(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+        run_id = config.get("configurable", {}).get("thread_id")
+        stage = config.get("metadata", {}).get("langgraph_node", agent.__name__)
+        before = dict(state)
+        if run_id:
+            record_stage(run_id, stage, 'running')
+        try:
+            result = agent(state)
+            error = result.get('error')
+            if run_id and error and error != before.get('error'):
+                raise StageError(f"{stage}: {error}")
+        except Exception as e:
+            if run_id:
+                record_stage(run_id, stage, 'failed', str(e))
+            raise
+        if run_id:
+            record_stage(run_id, stage, 'completed')
+        return {key: value for key, value in result.items() if key not in before or before[key] is not value}
+    
+    node.__name__ = agent.__name__
+    return node
+
+def _branch(output: type, *steps: Tuple[str, Callable[[AgentState], AgentState]]):
+    """A sequence of agents compiled as one subgraph that returns only the output keys"""
+    branch = StateGraph(AgentState, output=output)
+    for name, agent in steps:
+        branch.add_node(name, _node(agent))
+    for (name, _), (next_name, _) in zip(steps, steps[1:]):
+        branch.add_edge(name, next_name)
+    branch.add_edge(steps[-1][0], END)
+    branch.set_entry_point(steps[0][0])
+    return branch.compile()
+
 # Create the workflow
-def create_workflow() -> StateGraph:
+def create_workflow(checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
     """
     Create and configure the LangGraph workflow
     Optimized: Only essential agents to avoid timeouts
+    
+    Summaries need only the stored papers, not keywords or trends, so after
+    the search the keyword/trend and summary/image branches run in parallel.
+    Each branch is a subgraph, so it advances at its own pace and the run
+    takes as long as the slower branch.
     """
     workflow = StateGraph(AgentState)
     
     # Add essential agents only
-    workflow.add_node("arxiv_searcher", arxiv_search_agent)
-    workflow.add_node("keyword_extractor", keyword_extraction_agent)
-    workflow.add_node("trend_calculator", trend_analysis_agent)
-    workflow.add_node("summarizer", summary_generation_agent)
-    workflow.add_node("image_generator", image_creation_agent)
+    workflow.add_node("arxiv_searcher", _node(arxiv_search_agent))
+    workflow.add_node("keywords_and_trends", _branch(
+        TrendBranchOutput,
+        ("keyword_extractor", keyword_extraction_agent),
+        ("trend_calculator", trend_analysis_agent)
+    ))
+    workflow.add_node("summaries_and_images", _branch(
+        ContentBranchOutput,
+        ("summarizer", summary_generation_agent),
+        ("image_generator", image_creation_agent)
+    ))
     
     # Define the flow (removed report and social agents)
-    workflow.add_edge("arxiv_searcher", "keyword_extractor")
-    workflow.add_edge("keyword_extractor", "trend_calculator")
-    workflow.add_edge("trend_calculator", "summarizer")
-    workflow.add_edge("summarizer", "image_generator")
-    workflow.add_edge("image_generator", END)
+    workflow.add_edge("arxiv_searcher", "keywords_and_trends")
+    workflow.add_edge("arxiv_searcher", "summaries_and_images")
+    workflow.add_edge("keywords_and_trends", END)
+    workflow.add_edge("summaries_and_images", END)
     
     # Set entry point
     workflow.set_entry_point("arxiv_searcher")
     
-    return workflow.compile()
+    # Branch subgraphs share the workflow's checkpointer
+    return workflow.compile(checkpointer=checkpointer)
 
 # Run the workflow
-def run_workflow() -> Dict[str, Any]:
+class UnknownRunError(ValueError):
+    """A run to resume does not exist or has already completed"""
+
+# Runs executing in this process; runs of other processes are told apart by their heartbeat
+_active_runs = set()
+
+def run_workflow(run_id: Optional[str] = None, resume: bool = True) -> Dict[str, Any]:
     """
     Execute the complete workflow
+    Checkpoints are stored after every step, so with resume a run that
+    failed or was interrupted in the last WORKFLOW_RESUME_HOURS (or the run
+    given by run_id) continues from the nodes that had not finished. A run
+    that has failed WORKFLOW_MAX_ATTEMPTS times is left behind and a fresh
+    run starts instead. Raises UnknownRunError if run_id does not exist or
+    has already completed.
     """
-    print("🚀 Starting HCI Research Trends Workflow...\n")
+    saver = DatabaseSaver()
+    if run_id is not None:
+        status = run_status(run_id)
+        if status is None:
+            raise UnknownRunError(f"Workflow run {run_id} does not exist")
+        if status == 'completed':
+            raise UnknownRunError(f"Workflow run {run_id} has already completed")
+    elif resume:
+        run_id = resumable_run(exclude=_active_runs)
+    resumed = run_id is not None and saver.get_tuple({"configurable": {"thread_id": run_id}}) is not None
+    if run_id is None:
+        run_id = uuid.uuid4().hex
+    if run_id in _active_runs:
+        raise RuntimeError(f"Workflow run {run_id} is already running")
+    
+    if resumed:
+        print(f"🚀 Resuming HCI Research Trends Workflow run {run_id}...\n")
+    else:
+        print(f"🚀 Starting HCI Research Trends Workflow run {run_id}...\n")
     
     initial_state: AgentState = {
         'papers': [],
@@ -689,8 +917,27 @@ def run_workflow() -> Dict[str, Any]:
         'error': None
     }
     
-    app = create_workflow()
-    result = app.invoke(initial_state)
+    app = create_workflow(checkpointer=saver)
+    _active_runs.add(run_id)
+    try:
+        start_run(run_id)
+    except Exception:
+        _active_runs.discard(run_id)
+        raise
+    try:
+        with heartbeat(run_id):
+            result = app.invoke(None if resumed else initial_state, {"configurable": {"thread_id": run_id}})
+    except Exception as e:
+        finish_run(run_id, str(e))
+        print(f"❌ Workflow run {run_id} failed; the next run resumes it: {str(e)}")
+        raise
+    finally:
+        _active_runs.discard(run_id)
+    
+    # Completed runs keep their run and stage records, not their checkpoints
+    finish_run(run_id)
+    saver.delete_thread(run_id)
+    result['run_id'] = run_id
     
     print("\n✨ Workflow Complete!")
     print(f"Papers found: {len(result['papers'])}")
@@ -699,4 +946,32 @@ def run_workflow() -> Dict[str, Any]:
     print(f"Summaries generated: {len(result['summaries'])}")
     print(f"Social posts created: {len(result['social_posts'])}")
     
-    return result
\ No newline at end of file
+    return result
+
+# Backfill from metadata dumps
+def run_backfill(
+    paths: List[str],
+    categories: Optional[List[str]] = None,
+    since=None,
+    until=None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Seed the papers table from local arXiv metadata dumps instead of the live API
+    """
+    print("🚀 Starting ArXiv metadata backfill...\n")
+    
+    papers = filter_papers(
+        iter_dump(paths),
+        categories or config.ARXIV_CATEGORIES,
+        since=since,
+        until=until
+    )
+    stats = load_papers(papers, batch_size=batch_size)
+    
+    print("\n✨ Backfill Complete!")
+    print(f"Papers matched: {stats['scanned']}")
+    print(f"Papers inserted: {stats['inserted']}")
+    print(f"Throughput: {stats['rows_per_second']:.0f} rows/s over {stats['seconds']:.1f}s")
+    
+    return stats
@@ -0,0 +1,206 @@
+"""
+Bulk backfill of papers from local arXiv metadata snapshots
+Streams JSON Lines (Kaggle arxiv-metadata-oai-snapshot) or OAI-PMH XML
+(metadataPrefix=arXiv) dumps, optionally gzipped, so memory use does not
+depend on the size of the dump.
+
+Usage:
+    python backfill.py arxiv-metadata-oai-snapshot.json --since 2020-01-01
+    python backfill.py oai-dumps/ --categories cs.HC cs.CY
+"""
+from typing import Dict, Any, List, Iterator, Iterable, Optional
+from datetime import datetime, date
+import xml.etree.ElementTree as ET
+import argparse
+import gzip
+import json
+import os
+import time
+from database import SessionLocal, upsert_papers, paper_row, base_arxiv_id
+import config
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+
+def _open(path: str):
+    """Open a dump file in binary mode, transparently decompressing .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _paper(arxiv_id: str, title: str, authors: List[str], abstract: str,
+           categories: List[str], published_date: date) -> Dict[str, Any]:
+    """Build a paper dict in the same shape the search agent produces"""
+    arxiv_id = base_arxiv_id(arxiv_id)
+    return {
+        'arxiv_id': arxiv_id,
+        # Dumps keep the original line wrapping of titles and abstracts
+        'title': " ".join(title.split()),
+        'authors': authors,
+        'abstract': " ".join(abstract.split()),
+        'categories': categories,
+        'published_date': published_date,
+        'arxiv_url': f"http://arxiv.org/abs/{arxiv_id}",
+        'pdf_url': f"http://arxiv.org/pdf/{arxiv_id}"
+    }
+
+
+def iter_jsonl_papers(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield papers from a JSON Lines metadata snapshot, one line at a time"""
+    with _open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            versions = record.get('versions') or []
+            if versions:
+                # Date of v1 is what the API reports as published
+                published = datetime.strptime(versions[0]['created'], "%a, %d %b %Y %H:%M:%S %Z").date()
+            else:
+                published = datetime.strptime(record['update_date'], "%Y-%m-%d").date()
+
+            if record.get('authors_parsed'):
+                authors = [" ".join(part for part in reversed(name[:2]) if part) for name in record['authors_parsed']]
+            else:
+                authors = [name.strip() for name in record.get('authors', '').split(',') if name.strip()]
+
+            yield _paper(
+                arxiv_id=record['id'],
+                title=record['title'],
+                authors=authors,
+                abstract=record['abstract'],
+                categories=record['categories'].split(),
+                published_date=published
+            )
+
+
+def iter_oai_papers(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield papers from an OAI-PMH ListRecords XML dump, one record at a time"""
+    with _open(path) as f:
+        container = None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if elem.tag == f"{OAI_NS}ListRecords":
+                    container = elem
+                continue
+            if elem.tag != f"{OAI_NS}record":
+                continue
+
+            meta = elem.find(f"{OAI_NS}metadata/{ARXIV_NS}arXiv")
+            if meta is not None:
+                authors = []
+                for author in meta.iterfind(f"{ARXIV_NS}authors/{ARXIV_NS}author"):
+                    parts = [author.findtext(f"{ARXIV_NS}forenames"), author.findtext(f"{ARXIV_NS}keyname")]
+                    authors.append(" ".join(part for part in parts if part))
+
+                yield _paper(
+                    arxiv_id=meta.findtext(f"{ARXIV_NS}id"),
+                    title=meta.findtext(f"{ARXIV_NS}title", ""),
+                    authors=authors,
+                    abstract=meta.findtext(f"{ARXIV_NS}abstract", ""),
+                    categories=meta.findtext(f"{ARXIV_NS}categories", "").split(),
+                    published_date=datetime.strptime(meta.findtext(f"{ARXIV_NS}created"), "%Y-%m-%d").date()
+                )
+
+            # Drop parsed records so memory stays flat across the file
+            elem.clear()
+            if container is not None:
+                container.clear()
+
+
+def iter_dump(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield papers from every dump file in paths (directories are expanded)"""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_dump(sorted(os.path.join(path, name) for name in os.listdir(path)))
+            continue
+
+        name = path[:-3] if path.endswith(".gz") else path
+        if name.endswith(".xml"):
+            yield from iter_oai_papers(path)
+        else:
+            yield from iter_jsonl_papers(path)
+
+
+def filter_papers(papers: Iterable[Dict[str, Any]], categories: Iterable[str],
+                  since: Optional[date] = None, until: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """Keep papers listed in any of categories and published within [since, until]"""
+    categories = set(categories)
+    for paper in papers:
+        if categories.isdisjoint(paper['categories']):
+            continue
+        if since and paper['published_date'] < since:
+            continue
+        if until and paper['published_date'] > until:
+            continue
+        yield paper
+
+
+def load_papers(papers: Iterable[Dict[str, Any]], batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Insert papers in batches of batch_size, skipping arxiv_ids already stored.
+    Only one batch is held in memory at a time.
+    """
+    batch_size = batch_size or config.BACKFILL_BATCH_SIZE
+    db = SessionLocal()
+    started = time.monotonic()
+    scanned = 0
+    inserted = 0
+
+    def flush(batch: List[Dict[str, Any]]) -> int:
+        count = len(upsert_papers(db, batch))
+        db.commit()
+        elapsed = time.monotonic() - started
+        print(f"📦 Backfill: {scanned} papers matched, {inserted + count} inserted "
+              f"({scanned / elapsed:.0f} rows/s)")
+        return count
+
+    try:
+        batch = []
+        for paper in papers:
+            scanned += 1
+            batch.append(paper_row(paper))
+            if len(batch) >= batch_size:
+                inserted += flush(batch)
+                batch = []
+        if batch:
+            inserted += flush(batch)
+    finally:
+        db.close()
+
+    elapsed = time.monotonic() - started
+    return {
+        'scanned': scanned,
+        'inserted': inserted,
+        'seconds': elapsed,
+        'rows_per_second': scanned / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill papers from arXiv metadata dumps")
+    parser.add_argument("paths", nargs="+", help="JSON Lines / OAI-PMH XML files or directories (.gz ok)")
+    parser.add_argument("--categories", nargs="+", default=config.ARXIV_CATEGORIES)
+    parser.add_argument("--since", type=date.fromisoformat, help="Earliest published date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Latest published date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=config.BACKFILL_BATCH_SIZE)
+    parser.add_argument("--stream", action="store_true",
+                        help="Also extract keywords, summaries and images as papers are loaded (see pipeline.py)")
+    args = parser.parse_args()
+
+    if args.stream:
+        # Micro-batches of STREAM_BATCH_SIZE rather than --batch-size
+        from pipeline import run_streaming, dump_batches
+        papers = filter_papers(iter_dump(args.paths), args.categories, since=args.since, until=args.until)
+        run_streaming(dump_batches(papers))
+        return
+
+    from agents import run_backfill
+    run_backfill(args.paths, categories=args.categories, since=args.since,
+                 until=args.until, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
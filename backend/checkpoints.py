@@ -0,0 +1,352 @@
+"""
+Persistent workflow checkpoints and run records
+DatabaseSaver stores LangGraph checkpoints in the application database
+(PostgreSQL, or SQLite locally), so a run that crashes or is killed by a
+restart resumes at the node that did not finish instead of starting over.
+Each run has a workflow_runs row keyed by its id (the LangGraph thread_id)
+and a workflow_stages row per graph node it has started.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import random
+import threading
+from sqlalchemy import select, update, delete, exists, and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.serde.types import TASKS
+from database import engine, SessionLocal, WorkflowRun, WorkflowStage, WorkflowCheckpoint, WorkflowCheckpointWrite
+import config
+
+
+def _upsert(table, rows: List[Dict[str, Any]], index_elements: List[str], update_columns: List[str]):
+    insert = sqlite_insert if engine.dialect.name == "sqlite" else pg_insert
+    stmt = insert(table.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns}
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+
+
+class DatabaseSaver(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpoint saver on the SQLAlchemy engine; the same layout as
+    the in-memory MemorySaver, one row per checkpoint and per pending write.
+    Only the synchronous interface is implemented, as the workflow is run
+    with invoke().
+    """
+
+    def _tuple(self, row: WorkflowCheckpoint, db) -> CheckpointTuple:
+        writes = db.execute(
+            select(WorkflowCheckpointWrite)
+            .where(
+                WorkflowCheckpointWrite.thread_id == row.thread_id,
+                WorkflowCheckpointWrite.checkpoint_ns == row.checkpoint_ns,
+                WorkflowCheckpointWrite.checkpoint_id == row.checkpoint_id
+            )
+            .order_by(WorkflowCheckpointWrite.task_id, WorkflowCheckpointWrite.idx)
+        ).scalars().all()
+        sends = []
+        if row.parent_checkpoint_id:
+            sends = db.execute(
+                select(WorkflowCheckpointWrite)
+                .where(
+                    WorkflowCheckpointWrite.thread_id == row.thread_id,
+                    WorkflowCheckpointWrite.checkpoint_ns == row.checkpoint_ns,
+                    WorkflowCheckpointWrite.checkpoint_id == row.parent_checkpoint_id,
+                    WorkflowCheckpointWrite.channel == TASKS
+                )
+                .order_by(WorkflowCheckpointWrite.task_id, WorkflowCheckpointWrite.idx)
+            ).scalars().all()
+
+        def configurable(checkpoint_id: str) -> RunnableConfig:
+            return {"configurable": {
+                "thread_id": row.thread_id,
+                "checkpoint_ns": row.checkpoint_ns,
+                "checkpoint_id": checkpoint_id
+            }}
+
+        return CheckpointTuple(
+            config=configurable(row.checkpoint_id),
+            checkpoint={
+                **self.serde.loads_typed((row.checkpoint_type, row.checkpoint)),
+                "pending_sends": [self.serde.loads_typed((send.value_type, send.value)) for send in sends],
+            },
+            metadata=self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata)),
+            parent_config=configurable(row.parent_checkpoint_id) if row.parent_checkpoint_id else None,
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, write.value)))
+                for write in writes
+            ]
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The checkpoint named in config, or the thread's latest one"""
+        query = (
+            select(WorkflowCheckpoint)
+            .where(
+                WorkflowCheckpoint.thread_id == config["configurable"]["thread_id"],
+                WorkflowCheckpoint.checkpoint_ns == config["configurable"].get("checkpoint_ns", "")
+            )
+            .order_by(WorkflowCheckpoint.checkpoint_id.desc())
+            .limit(1)
+        )
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(WorkflowCheckpoint.checkpoint_id == checkpoint_id)
+        with SessionLocal() as db:
+            row = db.execute(query).scalars().first()
+            return self._tuple(row, db) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints matching config, newest first"""
+        query = select(WorkflowCheckpoint).order_by(WorkflowCheckpoint.checkpoint_id.desc())
+        if config:
+            query = query.where(WorkflowCheckpoint.thread_id == config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query = query.where(WorkflowCheckpoint.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(WorkflowCheckpoint.checkpoint_id == checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query = query.where(WorkflowCheckpoint.checkpoint_id < before_id)
+
+        with SessionLocal() as db:
+            for row in db.execute(query).scalars().all():
+                if limit is not None and limit <= 0:
+                    return
+                checkpoint = self._tuple(row, db)
+                if filter and not all(checkpoint.metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                if limit is not None:
+                    limit -= 1
+                yield checkpoint
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        checkpoint = checkpoint.copy()
+        checkpoint.pop("pending_sends")  # type: ignore[misc]
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_data = self.serde.dumps_typed(metadata)
+        _upsert(WorkflowCheckpoint, [{
+            'thread_id': thread_id,
+            'checkpoint_ns': checkpoint_ns,
+            'checkpoint_id': checkpoint["id"],
+            'parent_checkpoint_id': config["configurable"].get("checkpoint_id"),
+            'checkpoint_type': checkpoint_type,
+            'checkpoint': checkpoint_data,
+            'metadata_type': metadata_type,
+            'metadata': metadata_data
+        }], ["thread_id", "checkpoint_ns", "checkpoint_id"], ["checkpoint_type", "checkpoint", "metadata_type", "metadata"])
+        return {"configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"]
+        }}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str) -> None:
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_data = self.serde.dumps_typed(value)
+            rows.append({
+                'thread_id': config["configurable"]["thread_id"],
+                'checkpoint_ns': config["configurable"]["checkpoint_ns"],
+                'checkpoint_id': config["configurable"]["checkpoint_id"],
+                'task_id': task_id,
+                'idx': WRITES_IDX_MAP.get(channel, idx),
+                'channel': channel,
+                'value_type': value_type,
+                'value': value_data
+            })
+        if rows:
+            _upsert(
+                WorkflowCheckpointWrite, rows,
+                ["thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"],
+                ["channel", "value_type", "value"]
+            )
+
+    def get_next_version(self, current: Optional[str], channel) -> str:
+        """String versions, as MemorySaver uses, so they sort across resumes"""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def delete_thread(self, thread_id: str):
+        """Drop every checkpoint of a run"""
+        with engine.begin() as conn:
+            conn.execute(delete(WorkflowCheckpointWrite).where(WorkflowCheckpointWrite.thread_id == thread_id))
+            conn.execute(delete(WorkflowCheckpoint).where(WorkflowCheckpoint.thread_id == thread_id))
+
+
+def start_run(run_id: str):
+    """Record a new run, or another attempt of an existing one"""
+    now = datetime.utcnow()
+    insert = sqlite_insert if engine.dialect.name == "sqlite" else pg_insert
+    stmt = insert(WorkflowRun.__table__).values(
+        id=run_id, status='running', attempts=1, started_at=now, updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={'status': 'running', 'attempts': WorkflowRun.attempts + 1, 'error': None,
+              'updated_at': now, 'finished_at': None}
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+
+def run_status(run_id: str) -> Optional[str]:
+    """Status of a run, or None if there is no such run"""
+    with engine.connect() as conn:
+        return conn.execute(select(WorkflowRun.status).where(WorkflowRun.id == run_id)).scalar()
+
+
+def finish_run(run_id: str, error: Optional[str] = None):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            update(WorkflowRun)
+            .where(WorkflowRun.id == run_id)
+            .values(
+                status='failed' if error else 'completed',
+                error=error,
+                updated_at=now,
+                finished_at=None if error else now
+            )
+        )
+
+
+def resumable_run(exclude=()) -> Optional[str]:
+    """
+    The newest run within WORKFLOW_RESUME_HOURS that failed or was
+    interrupted, has a checkpoint, and has had fewer than
+    WORKFLOW_MAX_ATTEMPTS attempts.
+    A run still marked 'running' only counts as interrupted once it is not
+    in exclude (the runs active in this process) and its heartbeat is older
+    than WORKFLOW_STALE_SECONDS, as it may be executing in another process.
+    """
+    now = datetime.utcnow()
+    query = (
+        select(WorkflowRun.id)
+        .where(
+            or_(
+                WorkflowRun.status == 'failed',
+                and_(
+                    WorkflowRun.status == 'running',
+                    WorkflowRun.updated_at < now - timedelta(seconds=config.WORKFLOW_STALE_SECONDS)
+                )
+            ),
+            WorkflowRun.attempts < config.WORKFLOW_MAX_ATTEMPTS,
+            WorkflowRun.started_at >= now - timedelta(hours=config.WORKFLOW_RESUME_HOURS),
+            # A run that stopped before its first checkpoint has nothing to resume
+            exists().where(WorkflowCheckpoint.thread_id == WorkflowRun.id)
+        )
+        .order_by(WorkflowRun.started_at.desc())
+    )
+    if exclude:
+        query = query.where(WorkflowRun.id.notin_(list(exclude)))
+    with engine.connect() as conn:
+        return conn.execute(query.limit(1)).scalar()
+
+
+def _touch(run_id: str):
+    with engine.begin() as conn:
+        conn.execute(update(WorkflowRun).where(WorkflowRun.id == run_id).values(updated_at=datetime.utcnow()))
+
+
+@contextmanager
+def heartbeat(run_id: str):
+    """
+    Keep a run's updated_at fresh every WORKFLOW_HEARTBEAT_INTERVAL seconds
+    while it executes, so other processes do not take it for interrupted
+    during a long stage
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(config.WORKFLOW_HEARTBEAT_INTERVAL):
+            try:
+                _touch(run_id)
+            except Exception as e:
+                print(f"⚠️  Workflow heartbeat failed for run {run_id}: {str(e)}")
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{run_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def record_stage(run_id: str, stage: str, status: str, error: Optional[str] = None):
+    """Mark a stage of a run as running, completed or failed"""
+    now = datetime.utcnow()
+    row = {'run_id': run_id, 'stage': stage, 'status': status, 'error': error}
+    if status == 'running':
+        row.update(started_at=now, finished_at=None)
+    else:
+        row['finished_at'] = now
+    _upsert(WorkflowStage, [row], ["run_id", "stage"], [column for column in row if column not in ("run_id", "stage")])
+    _touch(run_id)
+
+
+def list_runs(limit: int = 20) -> List[Dict[str, Any]]:
+    """Recent runs with their stages, newest first"""
+    with SessionLocal() as db:
+        runs = db.execute(
+            select(WorkflowRun).order_by(WorkflowRun.started_at.desc()).limit(limit)
+        ).scalars().all()
+        stages = db.execute(
+            select(WorkflowStage)
+            .where(WorkflowStage.run_id.in_([run.id for run in runs]))
+            .order_by(WorkflowStage.started_at)
+        ).scalars().all()
+    by_run: Dict[str, List[Dict[str, Any]]] = {}
+    for stage in stages:
+        by_run.setdefault(stage.run_id, []).append({
+            'stage': stage.stage,
+            'status': stage.status,
+            'error': stage.error,
+            'started_at': stage.started_at.isoformat() if stage.started_at else None,
+            'finished_at': stage.finished_at.isoformat() if stage.finished_at else None
+        })
+    return [
+        {
+            'id': run.id,
+            'status': run.status,
+            'attempts': run.attempts,
+            'error': run.error,
+            'started_at': run.started_at.isoformat() if run.started_at else None,
+            'finished_at': run.finished_at.isoformat() if run.finished_at else None,
+            'stages': by_run.get(run.id, [])
+        }
+        for run in runs
+    ]
@@ -17,22 +17,93 @@ R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
 R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
 R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "hci-research-images")
 R2_PUBLIC_URL = os.getenv("R2_PUBLIC_URL")  # Optional: custom domain
+R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")  # Optional: any S3-compatible endpoint, e.g. MinIO for local testing
+
+# Image Pipeline
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 4))  # Images generated, downloaded and uploaded in parallel
+IMAGE_BACKLOG_PAGE_SIZE = 50  # Summaries without images read per keyset page
+IMAGE_MULTIPART_THRESHOLD = 8 * 1024 * 1024  # Uploads larger than this go multipart, in parts of this size
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))  # Processes encoding thumbnails/WebP/AVIF
+IMAGE_THUMBNAIL_WIDTH = 320  # Pixels; paper cards use the thumbnail
+IMAGE_VARIANT_QUALITY = 80
 
 # Redis
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Job Queue
+QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "")  # "redis", "database", or empty to summarize/draw inline
+QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", 600))  # Seconds a claimed job is hidden from other workers
+QUEUE_MAX_ATTEMPTS = 5  # Claims before a job is marked failed
+QUEUE_RETRY_DELAY = 60  # Seconds; a failed job waits attempts * this before its retry
+QUEUE_POLL_INTERVAL = 2.0  # Seconds an idle worker waits between claims
+
 # Frontend URL
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
 # ArXiv Settings
 ARXIV_CATEGORIES = ["cs.HC",  "cs.CY"]
-ARXIV_MAX_RESULTS = 50
-ARXIV_DAYS_BACK = 7
+ARXIV_MAX_RESULTS = None  # No cap: each category pages back to its watermark
+ARXIV_DAYS_BACK = 7  # How far back the first harvest of a category goes
+ARXIV_PAGE_SIZE = 100  # Papers checked and inserted per database round trip
+ARXIV_REQUEST_INTERVAL = 3.0  # arXiv politeness delay, shared by all fetch threads
+ARXIV_FETCH_WORKERS = len(ARXIV_CATEGORIES)
+BACKFILL_BATCH_SIZE = 5000  # Papers per executemany batch when loading metadata dumps
+
+# Streaming Mode
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 100))  # Papers per micro-batch (dump backfills)
+STREAM_QUEUE_DEPTH = 4  # Micro-batches buffered per stage before the stage feeding it blocks
+
+# Keyword Extraction
+KEYWORD_VOCABULARY_PATH = os.getenv(
+    "KEYWORD_VOCABULARY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "domain_terms.txt")
+)
+KEYWORD_TOP_K = 10  # Single-word keywords kept per paper, ranked by TF-IDF
+KEYWORD_MIN_COUNT = 2  # Single words must appear at least this often in an abstract
+KEYWORD_WORKERS = int(os.getenv("KEYWORD_WORKERS", 1))  # >1 tokenizes large batches in a process pool
+KEYWORD_CHUNK_SIZE = int(os.getenv("KEYWORD_CHUNK_SIZE", 2000))  # Abstracts per worker task
+
+# Trend Scoring
+TREND_WINDOW_WEEKS = 104  # History loaded into the keyword x week matrix
+TREND_EMA_ALPHA = 0.5  # Smoothing for EMA growth
+TREND_DECAY = 0.8  # Weekly decay of past frequencies in the trending score
+TREND_BURST_WINDOW = 8  # Trailing weeks a burst z-score is measured against
+TREND_BURST_WEIGHT = 0.5  # Score boost per positive standard deviation
+TREND_BURST_CAP = 3.0  # Deviations beyond this add no further boost
+TREND_RECOMPUTE_WORKERS = int(os.getenv("TREND_RECOMPUTE_WORKERS", 4))  # Week shards processed in parallel
 
 # Grok API Settings
 GROK_API_BASE_URL = os.getenv("GROK_API_BASE_URL", "https://api.x.ai/v1")
 GROK_MODEL_TEXT = "grok-3-mini"
 GROK_MODEL_IMAGE = "grok-2-image-1212"
+GROK_CONCURRENCY = int(os.getenv("GROK_CONCURRENCY", 8))  # Requests in flight at once
+GROK_REQUEST_TIMEOUT = 60  # Seconds per attempt
+GROK_DEADLINE = float(os.getenv("GROK_DEADLINE", 180))  # Seconds per paper, retries included
+GROK_MAX_RETRIES = 3
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", 5))  # Abstracts packed into one request; 1 disables batching
+SUMMARY_BACKLOG_PAGE_SIZE = 200  # Papers without summaries read per keyset page
+GROK_IMAGE_TIMEOUT = 120  # Image generation can take longer
+GROK_IMAGE_MAX_RETRIES = 2
+GROK_RATE_LIMIT = float(os.getenv("GROK_RATE_LIMIT", 2.0))  # Starting requests/second, adapted from response headers
+GROK_MIN_RATE_LIMIT = 0.1
+GROK_MAX_RATE_LIMIT = float(os.getenv("GROK_MAX_RATE_LIMIT", 20.0))
+GROK_BACKOFF_BASE = 1.0  # Seconds; doubled per retry, with full jitter
+GROK_BACKOFF_CAP = 30.0
+GROK_BREAKER_THRESHOLD = 5  # Consecutive failures before calls stop
+GROK_BREAKER_RESET = 30.0  # Seconds before a trial call is let through
+
+# LLM Response Cache
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite3")
+)  # Empty disables the cache
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Workflow Runs
+WORKFLOW_RESUME_HOURS = int(os.getenv("WORKFLOW_RESUME_HOURS", 24))  # A trigger resumes an interrupted run younger than this
+WORKFLOW_MAX_ATTEMPTS = int(os.getenv("WORKFLOW_MAX_ATTEMPTS", 3))  # Attempts (1 + resumes) before a failing run is given up
+WORKFLOW_HEARTBEAT_INTERVAL = 60  # Seconds between updates of a running run's updated_at
+WORKFLOW_STALE_SECONDS = GROK_DEADLINE * 2  # A running run without a heartbeat for this long was interrupted
 
 # Scheduling
 SCHEDULE_DAILY_HOUR = 9  # 9 AM UTC
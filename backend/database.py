@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date, TIMESTAMP, Float, JSON
+from sqlalchemy import create_engine, select, update, text, tuple_, UniqueConstraint, Index, Column, Integer, String, Text, Date, TIMESTAMP, Float, JSON, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, date
+import numbers
+import json
+import re
 import config
 
 Base = declarative_base()
@@ -20,12 +25,21 @@ class Paper(Base):
     pdf_url = Column(String(255), nullable=False)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+    # Backlog order: newest first, keyset-paginated on (published_date, id)
+    __table_args__ = (Index("ix_papers_published_date_id", "published_date", "id"),)
+
+class KeywordVocab(Base):
+    __tablename__ = "keyword_vocab"
+    
+    id = Column(Integer, primary_key=True)
+    term = Column(String(100), unique=True, nullable=False)
+
 class Keyword(Base):
     __tablename__ = "keywords"
     
     id = Column(Integer, primary_key=True, index=True)
     paper_id = Column(Integer, nullable=False, index=True)
-    keyword = Column(String(100), nullable=False, index=True)
+    keyword_id = Column(Integer, nullable=False, index=True)  # keyword_vocab.id
     source = Column(String(20), nullable=False)  # 'arxiv' or 'extracted'
     confidence = Column(Float, default=1.0)
     category = Column(String(50))
@@ -35,24 +49,108 @@ class Summary(Base):
     __tablename__ = "summaries"
     
     id = Column(Integer, primary_key=True, index=True)
-    paper_id = Column(Integer, nullable=False, index=True)
+    paper_id = Column(Integer, nullable=False, unique=True, index=True)  # One summary per paper
     summary_text = Column(Text, nullable=False)
     word_count = Column(Integer, nullable=False)
     difficulty_level = Column(String(20))
     generated_image_url = Column(Text)  # Changed to Text to support base64 data URLs
+    image_variants = Column(JSON)  # Variant name (thumbnail, webp, avif, original) -> URL
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
 class Trend(Base):
     __tablename__ = "trends"
+    # One rollup row per keyword per week
+    __table_args__ = (UniqueConstraint("keyword_id", "week_start", name="uq_trends_keyword_week"),)
     
     id = Column(Integer, primary_key=True, index=True)
-    keyword = Column(String(100), nullable=False, index=True)
+    keyword_id = Column(Integer, nullable=False, index=True)  # keyword_vocab.id
     week_start = Column(Date, nullable=False, index=True)
     frequency = Column(Integer, nullable=False)
     trending_score = Column(Float, nullable=False)
     growth_rate = Column(Float)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+class DocumentFrequency(Base):
+    __tablename__ = "document_frequencies"
+    
+    term = Column(String(100), primary_key=True)
+    doc_count = Column(Integer, nullable=False)  # Papers containing the term
+
+# Reserved document_frequencies row holding the number of papers scored so far
+CORPUS_SIZE_TERM = "__documents__"
+
+class HarvestWatermark(Base):
+    __tablename__ = "harvest_watermarks"
+    
+    category = Column(String(20), primary_key=True)
+    last_submitted = Column(TIMESTAMP, nullable=False)  # Newest submission seen (UTC)
+    last_arxiv_id = Column(String(20), nullable=False)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    # One job per kind and key (e.g. summary/paper id), however often it is enqueued
+    __table_args__ = (
+        UniqueConstraint("kind", "job_key", name="uq_jobs_kind_key"),
+        Index("ix_jobs_claim", "kind", "status", "visible_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    job_key = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    visible_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)  # Claimable from this time
+    last_error = Column(Text)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+class WorkflowRun(Base):
+    __tablename__ = "workflow_runs"
+    
+    id = Column(String(32), primary_key=True)  # Also the LangGraph thread_id of the run's checkpoints
+    status = Column(String(20), nullable=False)  # running, completed, failed
+    attempts = Column(Integer, nullable=False, default=1)  # 1 + number of resumes
+    error = Column(Text)
+    started_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow)
+    finished_at = Column(TIMESTAMP)
+
+class WorkflowStage(Base):
+    __tablename__ = "workflow_stages"
+    
+    run_id = Column(String(32), primary_key=True)
+    stage = Column(String(50), primary_key=True)  # Graph node name
+    status = Column(String(20), nullable=False)  # running, completed, failed
+    error = Column(Text)
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+
+class WorkflowCheckpoint(Base):
+    __tablename__ = "workflow_checkpoints"
+    
+    thread_id = Column(String(32), primary_key=True)
+    checkpoint_ns = Column(String(200), primary_key=True)  # "" for the workflow, set for branch subgraphs
+    checkpoint_id = Column(String(64), primary_key=True)
+    parent_checkpoint_id = Column(String(64))
+    checkpoint_type = Column(String(20), nullable=False)
+    checkpoint = Column(LargeBinary, nullable=False)
+    metadata_type = Column(String(20), nullable=False)
+    checkpoint_metadata = Column("metadata", LargeBinary, nullable=False)
+
+class WorkflowCheckpointWrite(Base):
+    __tablename__ = "workflow_checkpoint_writes"
+    
+    thread_id = Column(String(32), primary_key=True)
+    checkpoint_ns = Column(String(200), primary_key=True)
+    checkpoint_id = Column(String(64), primary_key=True)
+    task_id = Column(String(64), primary_key=True)
+    idx = Column(Integer, primary_key=True)
+    channel = Column(String(100), nullable=False)
+    value_type = Column(String(20), nullable=False)
+    value = Column(LargeBinary, nullable=False)
+
 # Database connection
 engine = create_engine(config.POSTGRES_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -67,4 +165,287 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def _insert(db):
+    """Dialect-specific insert() that supports ON CONFLICT clauses"""
+    return sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+
+def base_arxiv_id(arxiv_id):
+    """
+    arXiv id without its version suffix (2401.01234v2 -> 2401.01234).
+    Papers are stored under the base id whatever version a harvest or dump
+    reports, so arxiv_id dedups a paper across sources and revisions.
+    """
+    return re.sub(r"v\d+$", "", arxiv_id)
+
+def paper_row(paper):
+    """Map a paper dict as passed between agents onto Paper column values"""
+    return {
+        "arxiv_id": paper["arxiv_id"],
+        "title": paper["title"],
+        "authors": paper["authors"],
+        "abstract": paper["abstract"],
+        "arxiv_categories": paper["categories"],
+        "published_date": paper["published_date"],
+        "arxiv_url": paper["arxiv_url"],
+        "pdf_url": paper["pdf_url"],
+    }
+
+def upsert_papers(db, rows):
+    """
+    Bulk insert paper rows in a single statement, skipping arxiv_ids that
+    already exist (INSERT ... ON CONFLICT (arxiv_id) DO NOTHING RETURNING id).
+    Returns a dict of arxiv_id -> id for the rows that were actually inserted.
+    """
+    if not rows:
+        return {}
+    
+    stmt = (
+        _insert(db)(Paper)
+        .on_conflict_do_nothing(index_elements=["arxiv_id"])
+        .returning(Paper.id, Paper.arxiv_id)
+    )
+    # executemany form: SQLAlchemy batches the rows into multi-row
+    # INSERTs (insertmanyvalues), keeping each under the parameter limit
+    return {row.arxiv_id: row.id for row in db.execute(stmt, rows)}
+
+def insert_summary(db, row):
+    """
+    Insert one summary row unless its paper already has one
+    (INSERT ... ON CONFLICT (paper_id) DO NOTHING). Returns whether it was inserted.
+    """
+    stmt = (
+        _insert(db)(Summary)
+        .values(**row)
+        .on_conflict_do_nothing(index_elements=["paper_id"])
+        .returning(Summary.id)
+    )
+    return db.execute(stmt).first() is not None
+
+def summary_backlog(db, limit, after=None, paper_ids=None):
+    """
+    One page of papers that have no summary yet, newest first, found with a
+    single anti-join (papers LEFT JOIN summaries WHERE summaries.id IS NULL).
+    after is the (published_date, id) of the last paper of the previous page;
+    keyset paging keeps each page cheap and never revisits a paper that
+    failed earlier in the same pass. paper_ids restricts the page to those
+    papers (queue workers look up the papers of their jobs this way).
+    """
+    query = (
+        select(Paper.id, Paper.arxiv_id, Paper.title, Paper.abstract, Paper.published_date)
+        .outerjoin(Summary, Summary.paper_id == Paper.id)
+        .where(Summary.id.is_(None))
+        .order_by(Paper.published_date.desc(), Paper.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(Paper.published_date, Paper.id) < tuple_(*after))
+    if paper_ids is not None:
+        query = query.where(Paper.id.in_(paper_ids))
+    return [dict(row._mapping) for row in db.execute(query)]
+
+def image_backlog(db, limit, after=0, paper_ids=None):
+    """
+    One page of summaries that have no image yet, joined with their paper,
+    in summary id order. after is the last summary id of the previous page;
+    paper_ids restricts the page to those papers.
+    """
+    query = (
+        select(
+            Summary.id.label("summary_id"), Summary.summary_text,
+            Paper.id.label("paper_id"), Paper.arxiv_id, Paper.title
+        )
+        .join(Paper, Paper.id == Summary.paper_id)
+        .where(Summary.generated_image_url.is_(None), Summary.id > after)
+        .order_by(Summary.id)
+        .limit(limit)
+    )
+    if paper_ids is not None:
+        query = query.where(Paper.id.in_(paper_ids))
+    return [dict(row._mapping) for row in db.execute(query)]
+
+# term -> keyword_vocab.id for this process; vocab rows are never deleted
+_term_ids = {}
+
+def intern_terms(terms):
+    """
+    Map keyword terms to their keyword_vocab ids, creating missing terms.
+    Served from an in-process cache; only unseen terms touch the database.
+    New terms are committed on their own connection, so a cached id stays
+    valid even if the caller's transaction rolls back.
+    """
+    missing = list({term for term in terms if term not in _term_ids})
+    if missing:
+        insert = sqlite_insert if engine.dialect.name == "sqlite" else pg_insert
+        with engine.begin() as conn:
+            conn.execute(
+                insert(KeywordVocab).on_conflict_do_nothing(index_elements=["term"]),
+                [{"term": term} for term in missing]
+            )
+            for start in range(0, len(missing), 5000):
+                chunk = missing[start:start + 5000]
+                _term_ids.update(conn.execute(
+                    select(KeywordVocab.term, KeywordVocab.id).where(KeywordVocab.term.in_(chunk))
+                ).all())
+    return {term: _term_ids[term] for term in terms}
+
+class _CopyStream:
+    """File-like object that renders rows as CSV lazily while COPY reads it"""
+    
+    def __init__(self, rows, columns):
+        self._rows = iter(rows)
+        self._columns = columns
+        self._pending = ""
+    
+    @staticmethod
+    def _field(value):
+        # NULL is an unquoted empty field; every other non-number is quoted,
+        # so empty strings stay distinct from NULL
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, numbers.Integral):
+            return str(int(value))
+        if isinstance(value, numbers.Real):
+            return repr(float(value))
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        return '"' + str(value).replace('"', '""') + '"'
+    
+    def read(self, size=-1):
+        lines = []
+        length = len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = ",".join(self._field(row[column]) for column in self._columns) + "\n"
+            lines.append(line)
+            length += len(line)
+        data = self._pending + "".join(lines)
+        if size < 0:
+            size = len(data)
+        chunk, self._pending = data[:size], data[size:]
+        return chunk
+
+def _with_defaults(model, rows):
+    """Fill in Python-side column defaults (e.g. created_at), which COPY would skip"""
+    defaults = {}
+    for column in model.__table__.columns:
+        if column.default is not None and not column.primary_key:
+            defaults[column.key] = column.default
+    for row in rows:
+        row = dict(row)
+        for key, default in defaults.items():
+            if key not in row:
+                row[key] = default.arg(None) if default.is_callable else default.arg
+        yield row
+
+def bulk_write(db, model, rows):
+    """
+    Insert many rows of model inside the session's transaction.
+    PostgreSQL streams them through COPY FROM STDIN; other backends fall
+    back to executemany (batched by SQLAlchemy's insertmanyvalues).
+    Returns the number of rows written.
+    """
+    rows = list(_with_defaults(model, rows))
+    if not rows:
+        return 0
+    
+    if db.bind.dialect.name != "postgresql":
+        db.execute(model.__table__.insert(), rows)
+        return len(rows)
+    
+    _copy_rows(db, model.__tablename__, list(rows[0]), rows)
+    return len(rows)
+
+def _copy_rows(db, table, columns, rows):
+    """Stream rows into table with COPY FROM STDIN (PostgreSQL only)"""
+    copy_sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    # Raw DBAPI cursor on the session's own connection, so COPY joins its transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(copy_sql, _CopyStream(rows, columns))
+    finally:
+        cursor.close()
+
+def get_document_frequencies(db, terms, chunk_size=5000):
+    """
+    Persisted document frequencies for terms, plus the persisted corpus size.
+    Returns (dict of term -> doc_count, documents).
+    """
+    frequencies = {}
+    terms = list(terms) + [CORPUS_SIZE_TERM]
+    for start in range(0, len(terms), chunk_size):
+        chunk = terms[start:start + chunk_size]
+        frequencies.update(
+            db.query(DocumentFrequency.term, DocumentFrequency.doc_count)
+            .filter(DocumentFrequency.term.in_(chunk))
+        )
+    return frequencies, frequencies.pop(CORPUS_SIZE_TERM, 0)
+
+def add_document_frequencies(db, counts, documents):
+    """
+    Add a batch's document frequencies (and its document count) to the
+    persisted totals with INSERT ... ON CONFLICT DO UPDATE doc_count = doc_count + excluded.doc_count.
+    """
+    rows = [{"term": term, "doc_count": count} for term, count in counts.items() if count]
+    rows.append({"term": CORPUS_SIZE_TERM, "doc_count": documents})
+    
+    stmt = _insert(db)(DocumentFrequency)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["term"],
+        set_={"doc_count": DocumentFrequency.doc_count + stmt.excluded.doc_count}
+    )
+    db.execute(stmt, rows)
+
+def rollup_trends(db, week_start, counts):
+    """
+    Add keyword counts into the (keyword_id, week_start) rollup with
+    INSERT ... ON CONFLICT DO UPDATE frequency = frequency + excluded.frequency,
+    so repeated runs in one week accumulate instead of duplicating rows.
+    Returns a dict of keyword_id -> (trend id, new weekly frequency).
+    """
+    if not counts:
+        return {}
+    
+    stmt = _insert(db)(Trend)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["keyword_id", "week_start"],
+        set_={"frequency": Trend.frequency + stmt.excluded.frequency}
+    ).returning(Trend.id, Trend.keyword_id, Trend.frequency)
+    
+    rows = db.execute(stmt, [
+        # Scores are placeholders until the trend engine rescores the new totals
+        {"keyword_id": keyword_id, "week_start": week_start, "frequency": count, "trending_score": 0.0}
+        for keyword_id, count in counts.items()
+    ])
+    return {row.keyword_id: (row.id, row.frequency) for row in rows}
+
+def update_trend_scores(db, scores):
+    """
+    Bulk-update trending_score/growth_rate; scores is a list of dicts with the
+    trend id. PostgreSQL COPYs them into a temp table and applies one
+    UPDATE ... FROM; other backends use an executemany UPDATE by id.
+    """
+    if not scores:
+        return
+    
+    if db.bind.dialect.name != "postgresql":
+        db.execute(update(Trend), scores)
+        return
+    
+    db.execute(text(
+        "CREATE TEMP TABLE trend_scores "
+        "(id INTEGER PRIMARY KEY, trending_score DOUBLE PRECISION, growth_rate DOUBLE PRECISION)"
+    ))
+    _copy_rows(db, "trend_scores", ["id", "trending_score", "growth_rate"], scores)
+    db.execute(text(
+        "UPDATE trends t SET trending_score = s.trending_score, growth_rate = s.growth_rate "
+        "FROM trend_scores s WHERE t.id = s.id"
+    ))
+    db.execute(text("DROP TABLE trend_scores"))
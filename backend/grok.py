@@ -0,0 +1,229 @@
+"""
+Shared Grok API client
+One pooled keep-alive session per process, so concurrent agent threads
+reuse connections instead of opening one per request. Every call runs
+against a deadline that covers all of its retries. Completions and image
+generations are looked up in the response cache before any network call.
+
+All threads share one adaptive token bucket (tuned from the rate-limit
+headers and halved on 429s) and one circuit breaker. Retries back off
+exponentially with jitter, or for as long as Retry-After asks.
+"""
+from typing import Callable, Dict, Any, List, Optional
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import json
+import random
+import re
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from llm_cache import cache_key, response_cache
+from ratelimit import AdaptiveTokenBucket, CircuitBreaker
+import config
+
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+class GrokError(Exception):
+    """A Grok request failed, or ran out of time, after all retries"""
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a duration header: plain seconds ('2', '0.5') or Go-style ('1m30s', '250ms')"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parts = DURATION_RE.findall(value)
+        return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts) if parts else None
+
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds the server asked us to wait, from Retry-After (seconds or HTTP date)"""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    seconds = _seconds(value)
+    if seconds is None:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return max(seconds, 0.0)
+
+
+def rate_hint(headers) -> Optional[float]:
+    """Requests per second the server will still accept in its current window"""
+    remaining = headers.get("x-ratelimit-remaining-requests")
+    reset = _seconds(headers.get("x-ratelimit-reset-requests"))
+    if remaining is None or not reset:
+        return None
+    try:
+        return int(remaining) / reset
+    except ValueError:
+        return None
+
+
+def backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(config.GROK_BACKOFF_CAP, config.GROK_BACKOFF_BASE * 2 ** attempt))
+
+
+class GrokClient:
+    def __init__(self, api_key: str, base_url: str, pool_size: int):
+        self.base_url = base_url
+        self.limiter = AdaptiveTokenBucket(
+            config.GROK_RATE_LIMIT,
+            capacity=pool_size,
+            min_rate=config.GROK_MIN_RATE_LIMIT,
+            max_rate=config.GROK_MAX_RATE_LIMIT
+        )
+        self.breaker = CircuitBreaker(config.GROK_BREAKER_THRESHOLD, config.GROK_BREAKER_RESET)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+        # Keep one connection per concurrent caller alive
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, path: str, payload: Dict[str, Any], deadline: Optional[float] = None,
+             max_retries: Optional[int] = None, timeout: Optional[float] = None,
+             cache: bool = False, refresh: bool = False,
+             validate: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        POST payload to path and return the JSON body of the first 200
+        response. deadline is in seconds for the whole call, retries included;
+        each attempt is also capped at timeout (default GROK_REQUEST_TIMEOUT).
+        With cache=True the response is served from, and stored in, the
+        response cache under a hash of path and payload; refresh=True skips
+        the lookup and replaces the cached response. validate is called on
+        the body before it is cached; a ValueError from it is raised to the
+        caller and nothing is stored, and a cached body it rejects is dropped.
+        """
+        key = None
+        if cache and response_cache() is not None:
+            # The payload holds the model, the rendered prompt and all parameters
+            key = cache_key(path=path, payload=payload)
+            cached = None if refresh else response_cache().get(key)
+            if cached is not None:
+                result = json.loads(cached)
+                try:
+                    if validate is not None:
+                        validate(result)
+                    return result
+                except ValueError:
+                    response_cache().discard(key)
+
+        deadline = deadline or config.GROK_DEADLINE
+        timeout = timeout or config.GROK_REQUEST_TIMEOUT
+        max_retries = max_retries or config.GROK_MAX_RETRIES
+        expires = time.monotonic() + deadline
+        error = "no attempts made"
+
+        for attempt in range(max_retries):
+            if time.monotonic() >= expires:
+                raise GrokError(f"deadline of {deadline:.0f}s exceeded after {attempt} attempts: {error}")
+            if not self.breaker.allow():
+                raise GrokError(f"circuit open after repeated failures, not calling {path}: {error}")
+            try:
+                # Queued callers are served in order; give up rather than wait past the deadline
+                self.limiter.acquire(timeout=max(expires - time.monotonic(), 0.0))
+            except TimeoutError as e:
+                raise GrokError(f"deadline of {deadline:.0f}s would pass waiting for the rate limit: {e}")
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise GrokError(f"deadline of {deadline:.0f}s exceeded after {attempt} attempts: {error}")
+
+            wait = None
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}",
+                    json=payload,
+                    timeout=min(timeout, remaining)
+                )
+            except requests.RequestException as e:
+                self.breaker.record_failure()
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    self.breaker.record_success()
+                    self.limiter.succeeded(rate_hint(response.headers))
+                    result = response.json()
+                    if validate is not None:
+                        validate(result)
+                    if key is not None:
+                        response_cache().put(key, response.text)
+                    return result
+
+                error = f"status {response.status_code}: {response.text[:200]}"
+                if response.status_code == 429:
+                    # Throttled, not failing: slow every caller down
+                    self.breaker.record_success()
+                    wait = retry_after(response.headers)
+                    self.limiter.throttled(wait)
+                elif response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    # Other 4xx responses will not succeed on retry
+                    self.breaker.record_success()
+                    raise GrokError(error)
+
+            if attempt == max_retries - 1:
+                break
+            wait = wait if wait is not None else backoff(attempt)
+            if time.monotonic() + wait >= expires:
+                raise GrokError(f"deadline of {deadline:.0f}s would pass before retrying: {error}")
+            time.sleep(wait)
+
+        raise GrokError(f"failed after {max_retries} attempts: {error}")
+
+    def chat(self, messages: List[Dict[str, str]], deadline: Optional[float] = None,
+             validate: Optional[Callable[[str], Any]] = None, **params) -> str:
+        """
+        Return the message content of a text chat completion. validate is
+        called on the content, which is only cached once it returns.
+        """
+        def check(result: Dict[str, Any]):
+            try:
+                content = result['choices'][0]['message']['content']
+            except (KeyError, IndexError, TypeError):
+                raise ValueError("completion has no message content")
+            if validate is not None:
+                validate(content)
+        
+        result = self.post("/chat/completions", {
+            "model": config.GROK_MODEL_TEXT,
+            "messages": messages,
+            **params
+        }, deadline=deadline, cache=True, validate=check)
+        return result['choices'][0]['message']['content']
+
+    def _image_payload(self, prompt: str) -> Dict[str, Any]:
+        return {"model": config.GROK_MODEL_IMAGE, "prompt": prompt, "n": 1}
+
+    def generate_image(self, prompt: str, deadline: Optional[float] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the images/generations response for prompt; refresh=True
+        generates a new image instead of serving a cached response
+        """
+        return self.post("/images/generations", self._image_payload(prompt), deadline=deadline,
+                         max_retries=config.GROK_IMAGE_MAX_RETRIES,
+                         timeout=config.GROK_IMAGE_TIMEOUT, cache=True, refresh=refresh)
+
+    def forget_image(self, prompt: str):
+        """Drop a cached generation, e.g. once its temporary image URL has expired"""
+        if response_cache() is not None:
+            response_cache().discard(cache_key(path="/images/generations", payload=self._image_payload(prompt)))
+
+
+@lru_cache(maxsize=None)
+def grok_client() -> GrokClient:
+    """Process-wide client for the configured Grok API"""
+    return GrokClient(config.GROK_API_KEY, config.GROK_API_BASE_URL, config.GROK_CONCURRENCY)
@@ -0,0 +1,141 @@
+"""
+Concurrent ArXiv harvester
+Fetches every category in its own thread while a shared token bucket keeps
+the combined request rate within arXiv's politeness delay.
+"""
+from typing import Dict, Any, List, Tuple, Iterator, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
+import queue
+import arxiv
+from ratelimit import TokenBucket
+from database import base_arxiv_id
+import config
+
+# (submitted timestamp as naive UTC, arxiv_id) - ordering key for watermarks
+Position = Tuple[datetime, str]
+
+
+class GovernedClient(arxiv.Client):
+    """arxiv.Client whose page requests (and retries) draw from a shared TokenBucket"""
+
+    def __init__(self, governor: TokenBucket, page_size: int):
+        # Pacing is done by the governor, not per client
+        super().__init__(page_size=page_size, delay_seconds=0)
+        self.governor = governor
+
+    def _parse_feed(self, url, first_page=True, _try_index=0):
+        self.governor.acquire()
+        return super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+
+
+def paper_from_result(result) -> Dict[str, Any]:
+    """Convert an arxiv.Result into the paper dict passed between agents"""
+    return {
+        'arxiv_id': base_arxiv_id(result.get_short_id()),
+        'title': result.title,
+        'authors': [author.name for author in result.authors],
+        'abstract': result.summary,
+        'categories': result.categories,
+        'published_date': result.published.date(),
+        'arxiv_url': result.entry_id,
+        'pdf_url': result.pdf_url
+    }
+
+
+class HarvestCancelled(Exception):
+    """Raised inside fetch threads when the consumer stops reading"""
+
+
+def fetch_category(client: arxiv.Client, category: str, stop_at: Position, emit: Callable[[tuple], None]):
+    """
+    Page through one category newest-first until stop_at, emitting events:
+    ('page', category, papers) for each page, then ('done', category, newest)
+    where newest is the new watermark position (None if nothing was newer).
+    """
+    search = arxiv.Search(
+        query=f"cat:{category}",
+        max_results=config.ARXIV_MAX_RESULTS,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Descending
+    )
+
+    page = []
+    newest = None
+    for result in client.results(search):
+        paper_data = paper_from_result(result)
+        # TIMESTAMP columns hold naive UTC
+        position = (result.published.replace(tzinfo=None), paper_data['arxiv_id'])
+        if position[0] < stop_at[0] or position == stop_at:
+            break
+        if newest is None:
+            newest = position
+
+        page.append(paper_data)
+        if len(page) >= client.page_size:
+            emit(('page', category, page))
+            page = []
+    if page:
+        emit(('page', category, page))
+    emit(('done', category, newest))
+
+
+def harvest(stop_points: Dict[str, Position], governor: Optional[TokenBucket] = None) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Fetch all categories concurrently and stream their events as they arrive.
+    Pages are deduplicated by arxiv_id across categories, so a cross-listed
+    paper is only yielded once. Yields ('page', category, papers),
+    ('done', category, newest) and ('error', category, message) events.
+    """
+    if governor is None:
+        governor = TokenBucket(rate=1.0 / config.ARXIV_REQUEST_INTERVAL)
+
+    # Bounded so fast categories wait for the consumer instead of piling up pages
+    events = queue.Queue(maxsize=config.ARXIV_FETCH_WORKERS * 2)
+
+    cancelled = threading.Event()
+
+    def emit(event: tuple):
+        while not cancelled.is_set():
+            try:
+                events.put(event, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise HarvestCancelled()
+
+    def worker(category: str, stop_at: Position):
+        try:
+            client = GovernedClient(governor, page_size=config.ARXIV_PAGE_SIZE)
+            fetch_category(client, category, stop_at, emit)
+        except HarvestCancelled:
+            pass
+        except Exception as e:
+            try:
+                emit(('error', category, str(e)))
+            except HarvestCancelled:
+                pass
+
+    seen = set()
+    pending = len(stop_points)
+    with ThreadPoolExecutor(max_workers=config.ARXIV_FETCH_WORKERS) as pool:
+        for category, stop_at in stop_points.items():
+            pool.submit(worker, category, stop_at)
+
+        try:
+            while pending:
+                kind, category, payload = events.get()
+                if kind == 'page':
+                    papers: List[Dict[str, Any]] = []
+                    for paper in payload:
+                        if paper['arxiv_id'] not in seen:
+                            seen.add(paper['arxiv_id'])
+                            papers.append(paper)
+                    payload = papers
+                else:
+                    pending -= 1
+                yield kind, category, payload
+        finally:
+            # Unblock any fetch threads still waiting on a full queue
+            cancelled.set()
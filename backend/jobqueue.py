@@ -0,0 +1,289 @@
+"""
+Durable work queue for summary and image jobs
+Jobs are keyed per paper, so enqueueing the same work twice while it is
+queued or running is a no-op. A claimed job stays invisible to other workers
+for QUEUE_VISIBILITY_TIMEOUT seconds, renewed while its worker runs it; if
+the worker dies, the job becomes claimable again (or failed, if that was
+its last attempt), and the old claim can no longer complete or fail it. Failed jobs are retried with a growing delay up to
+QUEUE_MAX_ATTEMPTS times.
+
+Two backends share one interface:
+  redis     - sorted sets on REDIS_URL (production)
+  database  - the jobs table, claimed with SELECT ... FOR UPDATE SKIP LOCKED
+              on Postgres (SQLite serializes writers instead), for local use
+"""
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+import json
+import time
+from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database import engine, Job
+import config
+
+JOB_KINDS = ('summary', 'image')
+
+
+def _retry_delay(attempts: int) -> float:
+    return config.QUEUE_RETRY_DELAY * attempts
+
+
+class DatabaseQueue:
+    """Queue in the jobs table; each operation runs in its own transaction"""
+
+    def enqueue(self, kind: str, jobs: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Add (key, payload) jobs of kind. A key that is already queued or
+        running is left alone; a finished or failed one is queued again.
+        Returns the number of jobs (re)queued.
+        """
+        rows = [{'kind': kind, 'job_key': key, 'payload': payload} for key, payload in jobs]
+        if not rows:
+            return 0
+        now = datetime.utcnow()
+        insert = sqlite_insert if engine.dialect.name == "sqlite" else pg_insert
+        with engine.begin() as conn:
+            stmt = insert(Job)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["kind", "job_key"],
+                set_={'status': 'queued', 'attempts': 0, 'visible_at': now, 'payload': stmt.excluded.payload},
+                where=or_(Job.status == 'done', Job.status == 'failed')
+            ).returning(Job.id)
+            return len(conn.execute(stmt, rows).all())
+
+    def claim(self, kind: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Lease up to limit visible jobs of kind for QUEUE_VISIBILITY_TIMEOUT
+        seconds. Expired leases on their last attempt are marked failed instead.
+        """
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(
+                    Job.kind == kind,
+                    Job.status == 'running',
+                    Job.visible_at <= now,
+                    Job.attempts >= config.QUEUE_MAX_ATTEMPTS
+                )
+                .values(status='failed', last_error="lease expired on the last attempt", updated_at=now)
+            )
+            ids = conn.execute(
+                select(Job.id)
+                .where(Job.kind == kind, Job.status.in_(('queued', 'running')), Job.visible_at <= now)
+                .order_by(Job.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                return []
+            # Re-checking visible_at keeps the lease exclusive where SKIP LOCKED is unavailable
+            rows = conn.execute(
+                update(Job)
+                .where(Job.id.in_(ids), Job.visible_at <= now)
+                .values(
+                    status='running',
+                    attempts=Job.attempts + 1,
+                    visible_at=now + timedelta(seconds=config.QUEUE_VISIBILITY_TIMEOUT),
+                    updated_at=now
+                )
+                .returning(Job.job_key, Job.payload, Job.attempts)
+            ).all()
+        return [{'kind': kind, 'key': row.job_key, 'payload': row.payload, 'attempts': row.attempts} for row in rows]
+
+    @staticmethod
+    def _leased(job: Dict[str, Any]):
+        # The attempt number identifies the lease: once the job is claimed
+        # again, the earlier claim can no longer update it
+        return (
+            Job.kind == job['kind'],
+            Job.job_key == job['key'],
+            Job.status == 'running',
+            Job.attempts == job['attempts']
+        )
+
+    def extend(self, jobs: Iterable[Dict[str, Any]]):
+        """Renew the leases of claimed jobs that are still running"""
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            for job in jobs:
+                conn.execute(
+                    update(Job)
+                    .where(*self._leased(job))
+                    .values(visible_at=now + timedelta(seconds=config.QUEUE_VISIBILITY_TIMEOUT), updated_at=now)
+                )
+
+    def complete(self, job: Dict[str, Any]):
+        with engine.begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(*self._leased(job))
+                .values(status='done', last_error=None, updated_at=datetime.utcnow())
+            )
+
+    def fail(self, job: Dict[str, Any], error: str):
+        """Schedule a retry, or mark the job failed after QUEUE_MAX_ATTEMPTS"""
+        now = datetime.utcnow()
+        retry = job['attempts'] < config.QUEUE_MAX_ATTEMPTS
+        with engine.begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(*self._leased(job))
+                .values(
+                    status='queued' if retry else 'failed',
+                    visible_at=now + timedelta(seconds=_retry_delay(job['attempts'])),
+                    last_error=error[:1000],
+                    updated_at=now
+                )
+            )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Job counts by kind and status"""
+        with engine.connect() as conn:
+            rows = conn.execute(select(Job.kind, Job.status, func.count()).group_by(Job.kind, Job.status)).all()
+        stats: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+    def clear(self):
+        with engine.begin() as conn:
+            conn.execute(delete(Job))
+
+
+# Atomically lease due jobs: bump their visibility score and attempt count.
+# A due job that has used all ARGV[4] attempts had its last lease expire,
+# and is moved to the failed hash instead
+_CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local claimed = {}
+for _, key in ipairs(due) do
+    if tonumber(redis.call('HGET', KEYS[3], key) or '0') >= tonumber(ARGV[4]) then
+        redis.call('ZREM', KEYS[1], key)
+        redis.call('HDEL', KEYS[2], key)
+        redis.call('HDEL', KEYS[3], key)
+        redis.call('HSET', KEYS[4], key, 'lease expired on the last attempt')
+    else
+        redis.call('ZADD', KEYS[1], ARGV[3], key)
+        local attempts = redis.call('HINCRBY', KEYS[3], key, 1)
+        table.insert(claimed, {key, redis.call('HGET', KEYS[2], key), attempts})
+    end
+end
+return claimed
+"""
+
+# The operations below only apply while the caller's claim is the latest one:
+# the job's attempt count still equals the count it was claimed with
+_OWNED = "redis.call('HGET', KEYS[3], ARGV[1]) == ARGV[2]"
+
+# Push back the visibility of a running job
+_EXTEND_SCRIPT = f"""
+if {_OWNED} then
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[3], ARGV[1])
+end
+"""
+
+# Remove a job that finished, or failed for good (ARGV[3] holds the error)
+_FINISH_SCRIPT = f"""
+if {_OWNED} then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('HDEL', KEYS[3], ARGV[1])
+    if ARGV[3] then
+        redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+    end
+end
+"""
+
+
+class RedisQueue:
+    """
+    Queue in Redis. Per kind: a sorted set of job keys scored by the time
+    they become visible, and hashes of payloads, attempt counts and errors
+    of failed jobs. A key is in the sorted set exactly while it is queued or
+    running, which is what makes enqueueing idempotent.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+        self._extend = self.redis.register_script(_EXTEND_SCRIPT)
+        self._finish = self.redis.register_script(_FINISH_SCRIPT)
+
+    @staticmethod
+    def _keys(kind: str) -> Tuple[str, str, str, str]:
+        prefix = f"jobs:{kind}"
+        return f"{prefix}:pending", f"{prefix}:payload", f"{prefix}:attempts", f"{prefix}:failed"
+
+    def enqueue(self, kind: str, jobs: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        pending, payloads, attempts, failed = self._keys(kind)
+        jobs = list(jobs)
+        if not jobs:
+            return 0
+        now = time.time()
+        pipe = self.redis.pipeline()
+        for key, payload in jobs:
+            pipe.hsetnx(payloads, key, json.dumps(payload))
+        pipe.zadd(pending, {key: now for key, _ in jobs}, nx=True)
+        added = pipe.execute()[-1]
+        # Re-queued keys start over
+        pipe.hdel(failed, *[key for key, _ in jobs])
+        pipe.execute()
+        return added
+
+    def claim(self, kind: str, limit: int) -> List[Dict[str, Any]]:
+        now = time.time()
+        rows = self._claim(keys=self._keys(kind),
+                           args=[now, limit, now + config.QUEUE_VISIBILITY_TIMEOUT, config.QUEUE_MAX_ATTEMPTS])
+        return [
+            {'kind': kind, 'key': key.decode(), 'payload': json.loads(payload or '{}'), 'attempts': int(count)}
+            for key, payload, count in rows
+        ]
+
+    def extend(self, jobs: Iterable[Dict[str, Any]]):
+        """Renew the leases of claimed jobs that are still running"""
+        visible_at = time.time() + config.QUEUE_VISIBILITY_TIMEOUT
+        for job in jobs:
+            self._extend(keys=self._keys(job['kind']), args=[job['key'], job['attempts'], visible_at])
+
+    def complete(self, job: Dict[str, Any]):
+        self._finish(keys=self._keys(job['kind']), args=[job['key'], job['attempts']])
+
+    def fail(self, job: Dict[str, Any], error: str):
+        keys = self._keys(job['kind'])
+        if job['attempts'] < config.QUEUE_MAX_ATTEMPTS:
+            self._extend(keys=keys, args=[job['key'], job['attempts'], time.time() + _retry_delay(job['attempts'])])
+            return
+        self._finish(keys=keys, args=[job['key'], job['attempts'], error[:1000]])
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Due, leased or waiting to retry, and failed jobs by kind"""
+        stats = {}
+        now = time.time()
+        for kind in JOB_KINDS:
+            pending, _, _, failed = self._keys(kind)
+            queued = self.redis.zcount(pending, '-inf', now)
+            stats[kind] = {
+                'queued': queued,
+                'in_flight': self.redis.zcard(pending) - queued,
+                'failed': self.redis.hlen(failed)
+            }
+        return stats
+
+    def clear(self):
+        for kind in JOB_KINDS:
+            self.redis.delete(*self._keys(kind))
+
+
+@lru_cache(maxsize=None)
+def job_queue() -> Optional[Any]:
+    """The configured queue, or None when QUEUE_BACKEND is empty (work runs inline)"""
+    if config.QUEUE_BACKEND == "redis":
+        return RedisQueue(config.REDIS_URL)
+    if config.QUEUE_BACKEND == "database":
+        return DatabaseQueue()
+    return None
@@ -0,0 +1,273 @@
+"""
+Keyword extraction helpers
+Domain terms are compiled once into a token trie so each abstract is
+matched in a single pass, on whole-word boundaries. Single-word keywords
+are scored with corpus-level TF-IDF over a sparse term-document matrix;
+for large batches, tokenizing is sharded across a process pool.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import multiprocessing
+import re
+import numpy as np
+from scipy import sparse
+import config
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Stop words to exclude from single-word keywords
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these',
+    'those', 'we', 'our', 'us', 'they', 'their', 'them', 'it', 'its',
+    'which', 'who', 'what', 'where', 'when', 'how', 'why', 'paper',
+    'study', 'research', 'approach', 'method', 'propose', 'present',
+    'show', 'demonstrate', 'results', 'using', 'based', 'novel'
+}
+
+# Marks the end of a complete term inside the trie
+_TERM = object()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; punctuation and hyphens separate tokens"""
+    return TOKEN_RE.findall(text.lower())
+
+
+class TermMatcher:
+    """
+    Token trie over a term vocabulary. Terms only match whole tokens, so
+    'bias' does not match inside 'biased' and 'iot' not inside 'idiot'.
+    Hyphenated terms match either spelling ('human-computer' / 'human computer').
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.root: Dict = {}
+        self.terms: Set[str] = set()
+        for term in terms:
+            tokens = tokenize(term)
+            if not tokens:
+                continue
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_TERM] = term
+            self.terms.add(term)
+
+    @classmethod
+    def from_file(cls, path: str) -> "TermMatcher":
+        """Load one term per line; blank lines and # comments are ignored"""
+        with open(path, encoding="utf-8") as f:
+            terms = [line.split("#", 1)[0].strip().lower() for line in f]
+        return cls(term for term in terms if term)
+
+    @staticmethod
+    def _child(node: Dict, token: str):
+        # A plural 's' still matches ('transformers' -> 'transformer')
+        child = node.get(token)
+        if child is None and len(token) > 3 and token.endswith("s"):
+            child = node.get(token[:-1])
+        return child
+
+    def find_tokens(self, tokens: List[str]) -> Set[str]:
+        """Return every vocabulary term occurring in an already tokenized text"""
+        found = set()
+        root = self.root
+        for start in range(len(tokens)):
+            node = self._child(root, tokens[start])
+            position = start
+            while node is not None:
+                term = node.get(_TERM)
+                if term is not None:
+                    found.add(term)
+                position += 1
+                if position == len(tokens):
+                    break
+                node = self._child(node, tokens[position])
+        return found
+
+    def find(self, text: str) -> Set[str]:
+        """Return every vocabulary term occurring in text"""
+        return self.find_tokens(tokenize(text))
+
+
+@lru_cache(maxsize=None)
+def load_matcher(path: str) -> TermMatcher:
+    """Compile a vocabulary file once per process"""
+    return TermMatcher.from_file(path)
+
+
+def domain_matcher() -> TermMatcher:
+    """Matcher for the configured domain vocabulary"""
+    return load_matcher(config.KEYWORD_VOCABULARY_PATH)
+
+
+def candidate_words(tokens: List[str]) -> List[str]:
+    """Single-word keyword candidates: 4+ letters and not a stop word"""
+    return [
+        token for token in tokens
+        if 4 <= len(token) <= 100 and token.isalpha() and token not in STOP_WORDS
+    ]
+
+
+def document_terms(abstract: str, matcher: TermMatcher) -> List[str]:
+    """Every term occurrence in one abstract: candidate words plus domain terms"""
+    tokens = tokenize(abstract)
+    words = candidate_words(tokens)
+    seen = set(words)
+    # Domain terms count once each, unless already present as a single word;
+    # sorted so the vocabulary order does not depend on the process's hash seed
+    return words + sorted(term for term in matcher.find_tokens(tokens) if term not in seen)
+
+
+def build_term_matrix(abstracts: List[str], matcher: TermMatcher) -> Tuple[sparse.csr_matrix, List[str]]:
+    """
+    Tokenize a batch of abstracts once into a (documents x terms) count matrix.
+    Returns the matrix and its column vocabulary.
+    """
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, abstract in enumerate(abstracts):
+        terms = document_terms(abstract, matcher)
+        for term in terms:
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+        rows.extend([row] * len(terms))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(cols), dtype=np.float64), (rows, cols)),
+        shape=(len(abstracts), len(vocabulary))
+    )
+    matrix.sum_duplicates()
+    return matrix, list(vocabulary)
+
+
+# The caller's matcher, compiled once in each pool worker
+_worker_matcher: Optional[TermMatcher] = None
+
+
+def _init_term_worker(terms: List[str]):
+    global _worker_matcher
+    _worker_matcher = TermMatcher(terms)
+
+
+def _term_matrix_chunk(abstracts: List[str]) -> Tuple[sparse.csr_matrix, List[str]]:
+    """Process pool entry point"""
+    return build_term_matrix(abstracts, _worker_matcher)
+
+
+def build_term_matrix_parallel(abstracts: List[str], matcher: TermMatcher, workers: int,
+                               chunk_size: int) -> Tuple[sparse.csr_matrix, List[str]]:
+    """
+    Same result as build_term_matrix, with tokenizing sharded across a process
+    pool. Workers rebuild matcher from its terms. Chunk matrices come back
+    with local vocabularies, which are remapped onto one shared vocabulary
+    and stacked in order.
+    """
+    chunks = [abstracts[start:start + chunk_size] for start in range(0, len(abstracts), chunk_size)]
+
+    vocabulary: Dict[str, int] = {}
+    parts = []
+    # Spawned, not forked: keywords are extracted on a workflow branch thread
+    # while the other branch's thread pool is running
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_term_worker, initargs=(sorted(matcher.terms),)) as pool:
+        for chunk_matrix, chunk_terms in pool.map(_term_matrix_chunk, chunks):
+            remap = np.fromiter(
+                (vocabulary.setdefault(term, len(vocabulary)) for term in chunk_terms),
+                dtype=np.int64, count=len(chunk_terms)
+            )
+            parts.append((chunk_matrix, remap))
+
+    matrix = sparse.vstack([
+        sparse.csr_matrix(
+            (chunk_matrix.data, remap[chunk_matrix.indices], chunk_matrix.indptr),
+            shape=(chunk_matrix.shape[0], len(vocabulary))
+        )
+        for chunk_matrix, remap in parts
+    ], format="csr")
+    matrix.sort_indices()
+    return matrix, list(vocabulary)
+
+
+def tfidf_scores(matrix: sparse.csr_matrix, document_frequency: np.ndarray, documents: int) -> np.ndarray:
+    """
+    L2-normalised TF-IDF weight for every stored entry of matrix (aligned with
+    matrix.data), using corpus-wide document frequencies and document count.
+    """
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    doc_length = np.asarray(matrix.sum(axis=1)).ravel()
+
+    tf = matrix.data / doc_length[rows]
+    idf = np.log((1.0 + documents) / (1.0 + document_frequency)) + 1.0
+    weights = tf * idf[matrix.indices]
+
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=matrix.shape[0]))
+    return weights / norms[rows]
+
+
+def select_keywords(matrix: sparse.csr_matrix, scores: np.ndarray, domain_mask: np.ndarray,
+                    top_k: int, min_count: int) -> np.ndarray:
+    """
+    Indices into matrix.data of the entries to keep as keywords: every domain
+    term, plus each document's top_k single words seen at least min_count times.
+    """
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    is_domain = domain_mask[matrix.indices]
+
+    singles = np.flatnonzero(~is_domain & (matrix.data >= min_count))
+    # Sort by document, then by descending score, and rank within each document
+    order = singles[np.lexsort((-scores[singles], rows[singles]))]
+    ordered_rows = rows[order]
+    rank = np.arange(len(order)) - np.searchsorted(ordered_rows, ordered_rows)
+
+    return np.concatenate([np.flatnonzero(is_domain), order[rank < top_k]])
+
+
+def extract_keywords_batch(papers: List[Dict[str, Any]], matcher: TermMatcher,
+                           frequency_lookup: Callable[[List[str]], Tuple[Dict[str, int], int]]
+                           ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Extract and score keywords for a whole batch of papers at once.
+    frequency_lookup(terms) returns the persisted document frequencies of
+    those terms and the persisted document count. Returns the keyword rows
+    and the batch's own document frequencies, which the caller adds to the
+    persisted totals.
+    """
+    if not papers:
+        return [], {}
+
+    abstracts = [paper['abstract'] for paper in papers]
+    workers = config.KEYWORD_WORKERS
+    chunk_size = config.KEYWORD_CHUNK_SIZE
+    if workers > 1 and len(abstracts) > chunk_size:
+        matrix, terms = build_term_matrix_parallel(abstracts, matcher, workers, chunk_size)
+    else:
+        matrix, terms = build_term_matrix(abstracts, matcher)
+
+    domain_mask = np.fromiter((term in matcher.terms for term in terms), dtype=bool, count=len(terms))
+    stored_frequencies, stored_documents = frequency_lookup(terms)
+
+    # Each (document, term) entry is unique after sum_duplicates
+    batch_frequency = np.bincount(matrix.indices, minlength=len(terms))
+    document_frequency = batch_frequency + np.fromiter(
+        (stored_frequencies.get(term, 0) for term in terms), dtype=np.int64, count=len(terms)
+    )
+    scores = tfidf_scores(matrix, document_frequency, stored_documents + len(papers))
+    keep = select_keywords(matrix, scores, domain_mask, config.KEYWORD_TOP_K, config.KEYWORD_MIN_COUNT)
+
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    keywords = [
+        {
+            'paper_id': papers[rows[i]]['id'],
+            'keyword': terms[matrix.indices[i]],
+            'source': 'nlp_extracted',
+            'confidence': round(float(scores[i]), 4),
+            'category': 'topic'
+        }
+        for i in keep
+    ]
+    return keywords, dict(zip(terms, batch_frequency.tolist()))
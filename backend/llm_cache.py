@@ -0,0 +1,148 @@
+"""
+Content-addressed cache for LLM responses
+Responses are stored in a local SQLite file under a hash of everything that
+determines them (model, prompt template version, inputs, parameters), so a
+rerun after /reset or a failed run does not pay for the same completion
+twice. Least recently used entries are evicted once the cache outgrows
+LLM_CACHE_MAX_BYTES.
+"""
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import config
+
+
+def cache_key(**parts: Any) -> str:
+    """SHA-256 of the parts, independent of argument order"""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe key/value cache in one SQLite file. Hit and miss counters are
+    persisted alongside the entries, so they accumulate across runs.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_used ON entries (last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # Stored bytes are kept as a running total, so puts never scan the entries;
+        # caches created before the total existed are summed once here
+        self._conn.execute(
+            "INSERT OR IGNORE INTO counters (name, value) "
+            "SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries"
+        )
+
+    def _count(self, name: str, amount: int = 1):
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # Other processes may share the file; the size lookup and the counter
+        # update must see the same entries
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _total(self) -> int:
+        return self._conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+
+    def _entry_size(self, key: str) -> int:
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached value for key, or None; a hit marks the entry as recently used"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._count("hits")
+            return row[0]
+
+    def put(self, key: str, value: str):
+        """Store value under key, evicting the least recently used entries if over budget"""
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            with self._transaction():
+                replaced = self._entry_size(key)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time())
+                )
+                self._count("bytes", size - replaced)
+                self._evict()
+
+    def discard(self, key: str):
+        """Drop an entry whose value turned out to be unusable"""
+        with self._lock:
+            with self._transaction():
+                size = self._entry_size(key)
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count("bytes", -size)
+
+    def _evict(self):
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        # Free down to 90% of the budget so eviction does not run on every put
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        freed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._count("bytes", -freed)
+        self._count("evictions", len(victims))
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, stored bytes, and lifetime hits/misses/evictions"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            counters = dict(self._conn.execute("SELECT name, value FROM counters"))
+        return {
+            'entries': entries,
+            'bytes': counters.get('bytes', 0),
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'evictions': counters.get('evictions', 0)
+        }
+
+
+@lru_cache(maxsize=None)
+def response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache, or None when LLM_CACHE_PATH is empty"""
+    if not config.LLM_CACHE_PATH:
+        return None
+    return ResponseCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_BYTES)
@@ -0,0 +1,149 @@
+"""
+Load test for the summary and image stages
+Seeds synthetic papers into a scratch database, runs the real agents
+against the local Grok mock (started in-process unless --base-url is given)
+and reports papers per second and p50/p99 request latency per stage.
+
+Usage:
+    python loadtest.py --papers 500 --latency 0.8 --error-rate 0.02 --burst-every 30 --burst-length 3
+    python loadtest.py --papers 500 --base-url http://localhost:8100/v1   # mock already running
+"""
+from typing import Dict, Any, List, Tuple
+from collections import defaultdict
+from datetime import date
+import argparse
+import os
+import threading
+import time
+import uuid
+import numpy as np
+import uvicorn
+import mock_grok
+
+STAGES = {'/chat/completions': 'summaries', '/images/generations': 'images'}
+
+
+def start_mock(port: int) -> uvicorn.Server:
+    """Run the mock Grok API on a background thread"""
+    server = uvicorn.Server(uvicorn.Config(mock_grok.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def seed_papers(count: int) -> List[Dict[str, Any]]:
+    """Insert count synthetic papers and return them in the search agent's shape"""
+    from database import SessionLocal, upsert_papers, paper_row
+
+    run = uuid.uuid4().hex[:8]
+    # Ids fit papers.arxiv_id (VARCHAR(20)) for up to a million papers per run
+    arxiv_ids = [f"lt{run}{i:06d}" for i in range(count)]
+    papers = [
+        {
+            'arxiv_id': arxiv_id,
+            'title': f"Synthetic paper {i} on human-AI collaboration",
+            'authors': ["Load Test"],
+            'abstract': "We study how people collaborate with AI assistants in everyday tasks. " * 8,
+            'categories': ["cs.HC"],
+            'published_date': date.today(),
+            'arxiv_url': f"http://arxiv.org/abs/{arxiv_id}",
+            'pdf_url': f"http://arxiv.org/pdf/{arxiv_id}"
+        }
+        for i, arxiv_id in enumerate(arxiv_ids)
+    ]
+    db = SessionLocal()
+    try:
+        ids = upsert_papers(db, [paper_row(paper) for paper in papers])
+        db.commit()
+    finally:
+        db.close()
+    for paper in papers:
+        paper['id'] = ids[paper['arxiv_id']]
+    return papers
+
+
+def report(results: Dict[str, Tuple[int, float]], samples: Dict[str, List[Tuple[int, float]]]):
+    print(f"\n{'stage':<10} {'papers':>7} {'seconds':>8} {'papers/s':>9} {'requests':>9} "
+          f"{'p50 (s)':>8} {'p99 (s)':>8} {'429s':>5} {'5xx':>5}")
+    for stage, (papers, seconds) in results.items():
+        statuses = np.array([status for status, _ in samples[stage]], dtype=np.int64)
+        latencies = np.array([latency for _, latency in samples[stage]])
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        print(f"{stage:<10} {papers:>7} {seconds:>8.1f} {papers / seconds if seconds else 0:>9.2f} "
+              f"{len(statuses):>9} {p50:>8.2f} {p99:>8.2f} "
+              f"{int((statuses == 429).sum()):>5} {int((statuses >= 500).sum()):>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the summary and image stages against a Grok mock")
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--database-url", default="sqlite:///loadtest.sqlite3",
+                        help="Scratch database (papers and summaries are written to it)")
+    parser.add_argument("--base-url", help="Use an already running mock instead of starting one")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--cache", action="store_true", help="Keep the LLM response cache enabled")
+    mock_grok.add_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        mock_grok.configure(args)
+        server = start_mock(args.port)
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    # config is read at import time, so point it at the scratch setup first
+    os.environ["POSTGRES_URL"] = args.database_url
+    os.environ["GROK_API_BASE_URL"] = base_url
+    os.environ.setdefault("GROK_API_KEY", "mock")
+    if not args.cache:
+        os.environ["LLM_CACHE_PATH"] = ""
+    # Measure the agents themselves, not a job queue
+    os.environ["QUEUE_BACKEND"] = ""
+
+    from database import init_db, SessionLocal, Summary
+    from agents import summary_generation_agent, image_creation_agent
+    from grok import grok_client
+
+    samples: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+    lock = threading.Lock()
+
+    def record(response, *args, **kwargs):
+        for path, stage in STAGES.items():
+            if response.request.path_url.endswith(path):
+                with lock:
+                    samples[stage].append((response.status_code, response.elapsed.total_seconds()))
+
+    grok_client().session.hooks['response'].append(record)
+
+    init_db()
+    papers = seed_papers(args.papers)
+    print(f"🧪 Seeded {len(papers)} papers; Grok API at {base_url}")
+
+    def images_stored() -> int:
+        db = SessionLocal()
+        try:
+            return db.query(Summary).filter(Summary.generated_image_url != None).count()
+        finally:
+            db.close()
+
+    results = {}
+    state = {'papers': papers}
+
+    started = time.monotonic()
+    state = summary_generation_agent(state)
+    results['summaries'] = (len(state['summaries']), time.monotonic() - started)
+
+    before = images_stored()
+    started = time.monotonic()
+    state = image_creation_agent(state)
+    results['images'] = (images_stored() - before, time.monotonic() - started)
+
+    report(results, samples)
+    if server is not None:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 from fastapi import FastAPI, BackgroundTasks, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import date
 import uvicorn
 
-from database import init_db, get_db, SessionLocal, Paper, Keyword, Trend, Summary
+from database import init_db, get_db, SessionLocal, Paper, Keyword, KeywordVocab, Trend, Summary, HarvestWatermark, DocumentFrequency, WorkflowRun, WorkflowStage, WorkflowCheckpoint, WorkflowCheckpointWrite
 from agents import run_workflow
+from checkpoints import list_runs, run_status
+from pipeline import run_streaming, harvest_batches
+from recompute import recompute_trends
+from llm_cache import response_cache
+from jobqueue import job_queue
 import config
 
 app = FastAPI(title="HCI Research Trends API Made in Cincinnati", version="1.0.0")
@@ -22,6 +28,15 @@ app.add_middleware(
 # Models
 class WorkflowTrigger(BaseModel):
     force: Optional[bool] = False
+    run_id: Optional[str] = None  # Resume this run
+    resume: Optional[bool] = True  # Resume the latest interrupted run, if any
+    stream: Optional[bool] = False  # Stream papers through the stages in micro-batches (pipeline.py)
+
+class TrendRecompute(BaseModel):
+    since: date
+    until: Optional[date] = None
+    # Each worker is a process with its own database connections
+    workers: Optional[int] = Field(None, ge=1, le=config.TREND_RECOMPUTE_WORKERS)
 
 class StatusResponse(BaseModel):
     status: str
@@ -79,10 +94,28 @@ async def trigger_workflow(
     5. Create images
     6. Build reports
     7. Create social posts
+    
+    A run that failed or was interrupted (e.g. by a restart) is resumed from
+    its last checkpoint instead, unless resume is false. With stream, papers
+    go through the stages in micro-batches as they are harvested instead
+    (not checkpointed; anything unfinished stays in the backlogs).
     """
+    if trigger.run_id is not None and not trigger.stream:
+        status = run_status(trigger.run_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail=f"Workflow run {trigger.run_id} not found")
+        if status == 'completed':
+            raise HTTPException(status_code=409, detail=f"Workflow run {trigger.run_id} has already completed")
+    
     def run_in_background():
+        if trigger.stream:
+            try:
+                run_streaming(harvest_batches())
+            except Exception as e:
+                print(f"❌ Streaming run failed: {str(e)}")
+            return
         try:
-            result = run_workflow()
+            result = run_workflow(run_id=trigger.run_id, resume=trigger.resume)
             print(f"✅ Workflow completed successfully")
             print(f"   Papers: {len(result['papers'])}")
             print(f"   Keywords: {len(result['keywords'])}")
@@ -97,6 +130,11 @@ async def trigger_workflow(
         message="Workflow started in background. Check logs for progress."
     )
 
+@app.get("/workflow/runs")
+async def get_workflow_runs(limit: int = 20):
+    """Recent workflow runs with the status of each stage"""
+    return {"success": True, "data": list_runs(limit)}
+
 @app.get("/papers")
 async def get_papers(limit: int = 20, offset: int = 0):
     """Get recent papers"""
@@ -130,19 +168,25 @@ async def get_trends(limit: int = 20):
     """Get trending keywords"""
     db = SessionLocal()
     try:
-        trends = db.query(Trend).order_by(Trend.trending_score.desc()).limit(limit).all()
+        trends = (
+            db.query(Trend, KeywordVocab.term)
+            .join(KeywordVocab, KeywordVocab.id == Trend.keyword_id)
+            .order_by(Trend.trending_score.desc())
+            .limit(limit)
+            .all()
+        )
         return {
             "success": True,
             "data": [
                 {
                     "id": t.id,
-                    "keyword": t.keyword,
+                    "keyword": term,
                     "week_start": t.week_start.isoformat(),
                     "frequency": t.frequency,
                     "trending_score": t.trending_score,
                     "growth_rate": t.growth_rate
                 }
-                for t in trends
+                for t, term in trends
             ]
         }
     except Exception as e:
@@ -150,6 +194,34 @@ async def get_trends(limit: int = 20):
     finally:
         db.close()
 
+@app.post("/trends/recompute", response_model=StatusResponse)
+async def trigger_trend_recompute(
+    request: TrendRecompute,
+    background_tasks: BackgroundTasks
+):
+    """
+    Rebuild trends for a date range from the stored keywords and papers.
+    Each week is swapped in atomically, so /trends keeps serving the old
+    rows until that week's new rows are committed.
+    """
+    until = request.until or date.today()
+    if until < request.since:
+        raise HTTPException(status_code=400, detail="until must not be before since")
+
+    def run_in_background():
+        try:
+            result = recompute_trends(request.since, until, workers=request.workers)
+            print(f"✅ Trend recompute completed: {result['weeks']} weeks, {result['rows']} rows")
+        except Exception as e:
+            print(f"❌ Trend recompute failed: {str(e)}")
+
+    background_tasks.add_task(run_in_background)
+
+    return StatusResponse(
+        status="started",
+        message=f"Recomputing trends from {request.since} to {until} in background. Check logs for progress."
+    )
+
 @app.get("/summaries/{paper_id}")
 async def get_summary(paper_id: int):
     """Get summary for a specific paper"""
@@ -166,7 +238,8 @@ async def get_summary(paper_id: int):
                 "summary_text": summary.summary_text,
                 "word_count": summary.word_count,
                 "difficulty_level": summary.difficulty_level,
-                "generated_image_url": summary.generated_image_url
+                "generated_image_url": summary.generated_image_url,
+                "image_variants": summary.image_variants
             }
         }
     except HTTPException:
@@ -194,7 +267,9 @@ async def get_stats():
                 "total_keywords": keyword_count,
                 "total_trends": trend_count,
                 "total_summaries": summary_count,
-                "summaries_with_images": summaries_with_images
+                "summaries_with_images": summaries_with_images,
+                "llm_cache": response_cache().stats() if response_cache() is not None else None,
+                "job_queue": job_queue().stats() if job_queue() is not None else None
             }
         }
     finally:
@@ -262,8 +337,23 @@ async def reset_database():
         paper_count = db.query(Paper).count()
         db.query(Paper).delete()
         
+        # Without their watermarks the next harvest fetches the latest papers
+        # again, and document frequencies would still count the deleted corpus
+        db.query(HarvestWatermark).delete()
+        db.query(DocumentFrequency).delete()
+        
+        # A resumed run's checkpointed state would refer to the deleted papers
+        db.query(WorkflowCheckpointWrite).delete()
+        db.query(WorkflowCheckpoint).delete()
+        db.query(WorkflowStage).delete()
+        db.query(WorkflowRun).delete()
+        
         db.commit()
         
+        # Queued jobs would refer to the deleted papers
+        if job_queue() is not None:
+            job_queue().clear()
+        
         return StatusResponse(
             status="success",
             message=f"Database reset! Deleted {paper_count} papers, {keyword_count} keywords, {summary_count} summaries, {trend_count} trends"
@@ -0,0 +1,41 @@
+"""
+Migration script to store papers under their base arXiv id
+Strips version suffixes (2401.01234v2 -> 2401.01234) from papers.arxiv_id.
+Where several versions of a paper were stored, the oldest row is kept and
+the others are deleted with their keywords and summaries
+"""
+from sqlalchemy import create_engine, text
+import config
+
+def migrate():
+    engine = create_engine(config.POSTGRES_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TEMP TABLE duplicate_papers AS
+                SELECT p.id
+                FROM papers p
+                JOIN papers keep
+                  ON regexp_replace(keep.arxiv_id, 'v[0-9]+$', '') = regexp_replace(p.arxiv_id, 'v[0-9]+$', '')
+                 AND keep.id < p.id;
+            """))
+            conn.execute(text("DELETE FROM keywords WHERE paper_id IN (SELECT id FROM duplicate_papers);"))
+            conn.execute(text("DELETE FROM summaries WHERE paper_id IN (SELECT id FROM duplicate_papers);"))
+            removed = conn.execute(text("DELETE FROM papers WHERE id IN (SELECT id FROM duplicate_papers);")).rowcount
+            
+            renamed = conn.execute(text("""
+                UPDATE papers
+                SET arxiv_id = regexp_replace(arxiv_id, 'v[0-9]+$', '')
+                WHERE arxiv_id ~ 'v[0-9]+$';
+            """)).rowcount
+            conn.execute(text("DROP TABLE duplicate_papers;"))
+            conn.commit()
+            print(f"✅ Migration successful: removed {removed} duplicate versions, stripped the version from {renamed} arxiv_ids")
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Migration error: {str(e)}")
+            print("   No changes were applied")
+
+if __name__ == "__main__":
+    migrate()
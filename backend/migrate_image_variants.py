@@ -0,0 +1,24 @@
+"""
+Migration script to record image variant URLs on summaries
+Adds summaries.image_variants (JSON: variant name -> URL)
+"""
+from sqlalchemy import create_engine, text
+import config
+
+def migrate():
+    engine = create_engine(config.POSTGRES_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE summaries
+                ADD COLUMN IF NOT EXISTS image_variants JSON;
+            """))
+            conn.commit()
+            print("✅ Migration successful: added summaries.image_variants")
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Migration error: {str(e)}")
+
+if __name__ == "__main__":
+    migrate()
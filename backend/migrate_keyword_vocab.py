@@ -0,0 +1,55 @@
+"""
+Migration script to intern keyword strings into the keyword_vocab table
+keywords.keyword and trends.keyword (VARCHAR(100)) are replaced by integer
+keyword_id columns referencing keyword_vocab(id, term)
+"""
+from sqlalchemy import create_engine, text
+import config
+
+def migrate():
+    engine = create_engine(config.POSTGRES_URL)
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS keyword_vocab (
+                    id SERIAL PRIMARY KEY,
+                    term VARCHAR(100) UNIQUE NOT NULL
+                );
+            """))
+
+            for table in ("keywords", "trends"):
+                has_keyword = conn.execute(text("""
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = :table AND column_name = 'keyword'
+                """), {"table": table}).first()
+                if not has_keyword:
+                    print(f"   {table}.keyword already migrated, skipping")
+                    continue
+
+                conn.execute(text(f"""
+                    INSERT INTO keyword_vocab (term)
+                    SELECT DISTINCT keyword FROM {table}
+                    ON CONFLICT (term) DO NOTHING;
+                """))
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS keyword_id INTEGER;"))
+                conn.execute(text(f"""
+                    UPDATE {table} t SET keyword_id = v.id
+                    FROM keyword_vocab v
+                    WHERE v.term = t.keyword;
+                """))
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN keyword_id SET NOT NULL;"))
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_keyword_id ON {table} (keyword_id);"))
+                # Also drops the old string index ix_{table}_keyword
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN keyword;"))
+                print(f"   {table}: keyword strings replaced by keyword_id")
+
+            conn.commit()
+            print("✅ Migration successful: keywords and trends now reference keyword_vocab")
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Migration error: {str(e)}")
+            print("   No changes were applied")
+
+if __name__ == "__main__":
+    migrate()
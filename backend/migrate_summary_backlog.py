@@ -0,0 +1,25 @@
+"""
+Migration script to index the summary backlog query
+Adds a (published_date, id) index on papers for the newest-first keyset
+pages of papers without summaries
+"""
+from sqlalchemy import create_engine, text
+import config
+
+def migrate():
+    engine = create_engine(config.POSTGRES_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_papers_published_date_id
+                ON papers (published_date, id);
+            """))
+            conn.commit()
+            print("✅ Migration successful: added ix_papers_published_date_id")
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Migration error: {str(e)}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,31 @@
+"""
+Migration script to allow one summary per paper
+Duplicate summaries (written by two workers running the same job) are
+removed, keeping the oldest, and ix_summaries_paper_id becomes a unique
+index, which summary writes use as their ON CONFLICT target
+"""
+from sqlalchemy import create_engine, text
+import config
+
+def migrate():
+    engine = create_engine(config.POSTGRES_URL)
+    
+    with engine.connect() as conn:
+        try:
+            removed = conn.execute(text("""
+                DELETE FROM summaries s
+                USING summaries keep
+                WHERE s.paper_id = keep.paper_id
+                  AND s.id > keep.id;
+            """)).rowcount
+            conn.execute(text("DROP INDEX IF EXISTS ix_summaries_paper_id;"))
+            conn.execute(text("CREATE UNIQUE INDEX ix_summaries_paper_id ON summaries (paper_id);"))
+            conn.commit()
+            print(f"✅ Migration successful: removed {removed} duplicate summaries, ix_summaries_paper_id is unique")
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Migration error: {str(e)}")
+            print("   No changes were applied")
+
+if __name__ == "__main__":
+    migrate()
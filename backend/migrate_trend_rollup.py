@@ -0,0 +1,48 @@
+"""
+Migration script to turn trends into a (keyword_id, week_start) rollup
+Duplicate rows from repeated runs in the same week are merged by summing
+their partial counts, then a unique constraint is added
+"""
+from sqlalchemy import create_engine, text
+import config
+
+def migrate():
+    engine = create_engine(config.POSTGRES_URL)
+    
+    with engine.connect() as conn:
+        try:
+            # Keep the oldest row of each group and give it the summed frequency
+            merged = conn.execute(text("""
+                WITH groups AS (
+                    SELECT keyword_id, week_start, SUM(frequency) AS frequency, MIN(id) AS keep_id
+                    FROM trends
+                    GROUP BY keyword_id, week_start
+                    HAVING COUNT(*) > 1
+                )
+                UPDATE trends t
+                SET frequency = g.frequency, trending_score = g.frequency * 1.5
+                FROM groups g
+                WHERE t.id = g.keep_id;
+            """)).rowcount
+            
+            conn.execute(text("""
+                DELETE FROM trends t
+                USING trends keep
+                WHERE t.keyword_id = keep.keyword_id
+                  AND t.week_start = keep.week_start
+                  AND t.id > keep.id;
+            """))
+            
+            conn.execute(text("""
+                ALTER TABLE trends
+                ADD CONSTRAINT uq_trends_keyword_week UNIQUE (keyword_id, week_start);
+            """))
+            conn.commit()
+            print(f"✅ Migration successful: merged {merged} duplicated keyword-weeks, added uq_trends_keyword_week")
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Migration error: {str(e)}")
+            print("   This is OK if the constraint already exists")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,191 @@
+"""
+Local stand-in for the Grok (xAI) API
+Serves /v1/chat/completions and /v1/images/generations with configurable
+latency, error rates, request quota and periodic 429 bursts, so the summary
+and image stages can be benchmarked without spending API quota.
+
+Usage:
+    python mock_grok.py --port 8100 --latency 0.8 --error-rate 0.02 --burst-every 60 --burst-length 5
+    GROK_API_BASE_URL=http://localhost:8100/v1 GROK_API_KEY=mock python main.py
+"""
+from typing import Optional
+from dataclasses import dataclass
+from functools import lru_cache
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+import uvicorn
+
+PAPER_ID_RE = re.compile(r"Paper id: (\S+)")
+IMAGE_SHADES = 4
+
+FILLER = (
+    "Problem/Background: The paper studies how people interact with computing systems in practice. "
+    "Solution/Approach: The authors design and evaluate a new method with a user study. "
+    "Key Findings: Participants completed tasks faster and reported lower workload. "
+    "Impact: The results inform the design of more usable and equitable technology."
+)
+
+
+@dataclass
+class MockSettings:
+    latency: float = 0.8  # Median seconds per chat completion
+    image_latency: float = 3.0  # Median seconds per image generation
+    sigma: float = 0.5  # Log-normal spread of latencies
+    error_rate: float = 0.0  # Fraction of requests answered with a 500
+    quota: int = 0  # Requests accepted per minute (0 = unlimited)
+    burst_every: float = 0.0  # Seconds between 429 bursts (0 = none)
+    burst_length: float = 0.0  # Seconds each burst lasts
+    image_bytes: int = 0  # Serve random bytes of this size instead of real JPEGs
+
+
+settings = MockSettings()
+started = time.monotonic()
+window = {'start': time.monotonic(), 'count': 0}
+
+app = FastAPI(title="Mock Grok API")
+
+
+def _throttled(retry_after: float, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"error": message},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+async def _simulate(median: float) -> Optional[Response]:
+    """Apply bursts, quota, latency and errors; returns an error response or None"""
+    elapsed = time.monotonic() - started
+    if settings.burst_every and elapsed % settings.burst_every < settings.burst_length:
+        return _throttled(settings.burst_length - elapsed % settings.burst_every, "rate limit burst")
+
+    if settings.quota:
+        now = time.monotonic()
+        if now - window['start'] >= 60:
+            window['start'], window['count'] = now, 0
+        if window['count'] >= settings.quota:
+            return _throttled(60 - (now - window['start']), "quota exceeded")
+        window['count'] += 1
+
+    await asyncio.sleep(random.lognormvariate(math.log(median), settings.sigma))
+    if random.random() < settings.error_rate:
+        return JSONResponse(status_code=500, content={"error": "simulated server error"})
+    return None
+
+
+def _rate_headers() -> dict:
+    if not settings.quota:
+        return {}
+    reset = max(0.0, 60 - (time.monotonic() - window['start']))
+    return {
+        "x-ratelimit-limit-requests": str(settings.quota),
+        "x-ratelimit-remaining-requests": str(max(0, settings.quota - window['count'])),
+        "x-ratelimit-reset-requests": f"{reset:.1f}s"
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    error = await _simulate(settings.latency)
+    if error is not None:
+        return error
+
+    prompt = body['messages'][-1]['content']
+    if body.get('response_format'):
+        # Batched summaries: one entry per paper id in the prompt
+        content = json.dumps({
+            "summaries": [{"id": paper_id, "summary": FILLER} for paper_id in PAPER_ID_RE.findall(prompt)]
+        })
+    else:
+        content = FILLER
+
+    return JSONResponse(headers=_rate_headers(), content={
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "model": body.get('model'),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split())}
+    })
+
+
+@app.post("/v1/images/generations")
+async def image_generations(request: Request):
+    body = await request.json()
+    error = await _simulate(settings.image_latency)
+    if error is not None:
+        return error
+
+    return JSONResponse(headers=_rate_headers(), content={
+        "data": [
+            {"url": f"{str(request.base_url).rstrip('/')}/files/{uuid.uuid4().hex}.jpeg", "revised_prompt": body.get('prompt')}
+            for _ in range(body.get('n', 1))
+        ]
+    })
+
+
+@lru_cache(maxsize=None)
+def _jpeg(shade: int) -> Optional[bytes]:
+    """A real 1024x1024 JPEG in one of a few shades, or None without Pillow"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    buffer = io.BytesIO()
+    Image.new("RGB", (1024, 1024), (40 * shade, 120, 255 - 40 * shade)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@app.get("/files/{name}")
+async def image_file(name: str):
+    """
+    Stand-in for the temporary image URLs. With Pillow this is one of
+    IMAGE_SHADES real JPEGs (so identical images recur, as with a cache),
+    otherwise image_bytes random bytes.
+    """
+    content = _jpeg(int(name[:8], 16) % IMAGE_SHADES) if not settings.image_bytes else None
+    return Response(content=content or os.urandom(settings.image_bytes or 200_000), media_type="image/jpeg")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    defaults = MockSettings()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Median chat latency (s)")
+    parser.add_argument("--image-latency", type=float, default=defaults.image_latency, help="Median image latency (s)")
+    parser.add_argument("--sigma", type=float, default=defaults.sigma, help="Log-normal latency spread")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--quota", type=int, default=defaults.quota, help="Requests per minute, 0 = unlimited")
+    parser.add_argument("--burst-every", type=float, default=defaults.burst_every, help="Seconds between 429 bursts")
+    parser.add_argument("--burst-length", type=float, default=defaults.burst_length, help="Seconds per 429 burst")
+    parser.add_argument("--image-bytes", type=int, default=defaults.image_bytes)
+
+
+def configure(args: argparse.Namespace):
+    """Apply parsed command-line options to the running mock"""
+    for field in MockSettings.__dataclass_fields__:
+        setattr(settings, field, getattr(args, field))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Grok API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
+    print(f"🧪 Mock Grok API on http://{args.host}:{args.port}/v1 ({settings})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Streaming execution mode
+Instead of each agent finishing its whole list before the next one starts,
+papers flow through fetch -> keywords -> summaries -> images in micro-batches.
+Each stage is a thread fed by a bounded queue, so a slow stage makes the ones
+before it wait instead of buffering papers, and only a few micro-batches are
+in memory at any time, however many papers a backfill streams through.
+Keyword counts for the trend update are the only thing kept for the whole
+run, one entry per distinct keyword and published week.
+
+Usage:
+    python pipeline.py                                   # live arXiv harvest
+    python pipeline.py --dump arxiv-metadata-oai-snapshot.json.gz --since 2024-01-01
+    python pipeline.py --dump oai-dumps/ --skip images
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+import argparse
+import queue
+import threading
+import time
+from database import SessionLocal, init_db, image_backlog
+from agents import (
+    _harvest_new_papers, _store_new_papers, _store_keywords, _update_trends,
+    _summarize_papers, _store_summary, _create_image, _store_image
+)
+from backfill import iter_dump, filter_papers
+from jobqueue import job_queue
+from trends import week_of
+import config
+
+STAGES = ('keywords', 'summaries', 'images')
+
+# Marks the end of a stage's input
+_END = object()
+
+
+class PipelineStopped(Exception):
+    """Raised in a stage blocked on a queue after another stage failed"""
+
+
+def dump_batches(papers: Iterable[Dict[str, Any]], batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Store papers from a metadata dump in micro-batches and yield each batch's newly stored papers"""
+    batch_size = batch_size or config.STREAM_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        batch = []
+        for paper in papers:
+            batch.append(paper)
+            if len(batch) >= batch_size:
+                stored = _store_new_papers(db, batch)
+                if stored:
+                    yield stored
+                batch = []
+        if batch:
+            stored = _store_new_papers(db, batch)
+            if stored:
+                yield stored
+    finally:
+        db.close()
+
+
+def harvest_batches() -> Iterator[List[Dict[str, Any]]]:
+    """Harvest arXiv up to the watermarks, yielding each page's newly stored papers"""
+    db = SessionLocal()
+    try:
+        yield from _harvest_new_papers(db)
+    finally:
+        db.close()
+
+
+def run_streaming(batches: Iterable[List[Dict[str, Any]]], skip: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Run micro-batches of stored papers through the keyword, summary and image
+    stages concurrently, then add the run's keyword counts to the trends of
+    the weeks the papers were published in.
+    Stages in skip are left out (images are only made for summaries made
+    here). With QUEUE_BACKEND set, the summary stage enqueues jobs for the
+    queue workers instead. Raises the first stage error after stopping the
+    rest and rolling up the keywords stored until then.
+    """
+    skip = set(skip)
+    if not config.GROK_API_KEY:
+        print("⚠️  Warning: GROK_API_KEY not set, skipping summaries and images")
+        skip |= {'summaries', 'images'}
+    if 'summaries' in skip or job_queue() is not None:
+        skip.add('images')
+
+    stop = threading.Event()
+    errors: List[str] = []
+    stats = Counter()
+    keyword_counts = Counter()
+    started = time.monotonic()
+    inputs = {stage: queue.Queue(maxsize=config.STREAM_QUEUE_DEPTH) for stage in STAGES if stage not in skip}
+
+    def put(stage: str, item: Any):
+        while not stop.is_set():
+            try:
+                inputs[stage].put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise PipelineStopped()
+
+    def take(stage: str) -> Iterator[Any]:
+        while not stop.is_set():
+            try:
+                item = inputs[stage].get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _END:
+                return
+            yield item
+        raise PipelineStopped()
+
+    def keyword_stage():
+        db = SessionLocal()
+        try:
+            for papers in take('keywords'):
+                keywords = _store_keywords(db, papers)
+                # Counted in each paper's published week, so a backfill
+                # spreads over the weeks it covers instead of this one
+                weeks = {paper['id']: week_of(paper['published_date']) for paper in papers}
+                keyword_counts.update((weeks[keyword['paper_id']], keyword['keyword']) for keyword in keywords)
+                stats['keywords'] += len(keywords)
+        finally:
+            db.close()
+
+    def summary_stage():
+        db = SessionLocal()
+        batch_size = max(1, config.SUMMARY_BATCH_SIZE)
+        try:
+            with ThreadPoolExecutor(max_workers=config.GROK_CONCURRENCY) as pool:
+                for papers in take('summaries'):
+                    if job_queue() is not None:
+                        stats['summaries_queued'] += job_queue().enqueue(
+                            'summary', [(str(paper['id']), {'paper_id': paper['id']}) for paper in papers]
+                        )
+                        continue
+                    groups = [papers[i:i + batch_size] for i in range(0, len(papers), batch_size)]
+                    summarized = []
+                    for future in as_completed([pool.submit(_summarize_papers, group) for group in groups]):
+                        for paper, summary_text, error in future.result():
+                            if error is not None:
+                                # Left in the backlog for the next run
+                                print(f"⚠️  Error generating summary for paper {paper['arxiv_id']}: {error}")
+                                continue
+                            if _store_summary(db, paper, summary_text) is None:
+                                continue
+                            summarized.append(paper['id'])
+                            if not stats['summaries']:
+                                stats['first_summary_seconds'] = round(time.monotonic() - started, 2)
+                            stats['summaries'] += 1
+                    if 'images' in inputs and summarized:
+                        put('images', summarized)
+        finally:
+            db.close()
+            if 'images' in inputs and not stop.is_set():
+                put('images', _END)
+
+    def image_stage():
+        db = SessionLocal()
+        try:
+            with ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS) as pool:
+                for paper_ids in take('images'):
+                    items = image_backlog(db, len(paper_ids), paper_ids=paper_ids)
+                    futures = {pool.submit(_create_image, item): item for item in items}
+                    for future in as_completed(futures):
+                        item = futures[future]
+                        try:
+                            image_url, variant_urls, _ = future.result()
+                        except Exception as e:
+                            print(f"⚠️  Error generating image for paper {item['arxiv_id']}: {str(e)}")
+                            continue
+                        if image_url is not None:
+                            _store_image(db, item, image_url, variant_urls)
+                            stats['images'] += 1
+        finally:
+            db.close()
+
+    def run(stage: Callable[[], None]):
+        try:
+            stage()
+        except PipelineStopped:
+            pass
+        except Exception as e:
+            errors.append(f"{stage.__name__}: {str(e)}")
+            stop.set()
+
+    stage_functions = {'keywords': keyword_stage, 'summaries': summary_stage, 'images': image_stage}
+    threads = [
+        threading.Thread(target=run, args=(stage_functions[stage],), name=f"stream-{stage}", daemon=True)
+        for stage in inputs
+    ]
+    for thread in threads:
+        thread.start()
+
+    print(f"🌊 Streaming papers through {', '.join(inputs) or 'storage only'} "
+          f"({config.STREAM_QUEUE_DEPTH} micro-batches buffered per stage)")
+    try:
+        for papers in batches:
+            stats['papers'] += len(papers)
+            stats['batches'] += 1
+            # Blocks while a stage is STREAM_QUEUE_DEPTH batches behind
+            for stage in ('keywords', 'summaries'):
+                if stage in inputs:
+                    put(stage, papers)
+            if stats['batches'] % 10 == 0:
+                print(f"🌊 {stats['papers']} papers, {stats['keywords']} keywords, "
+                      f"{stats['summaries']} summaries, {stats['images']} images")
+        for stage in ('keywords', 'summaries'):
+            if stage in inputs:
+                put(stage, _END)
+    except PipelineStopped:
+        pass
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for thread in threads:
+            thread.join()
+        # Keywords stored so far are committed, so their counts are rolled up
+        # even when a stage failed
+        if keyword_counts:
+            db = SessionLocal()
+            try:
+                stats['trends'] = len(_update_trends(db, keyword_counts))
+            finally:
+                db.close()
+
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+    stats['seconds'] = round(time.monotonic() - started, 1)
+    print(f"✅ Streaming run complete: {dict(stats)}")
+    return dict(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream papers through keywords, summaries and images in micro-batches")
+    parser.add_argument("--dump", nargs="+", help="Stream from arXiv metadata dumps instead of the live API")
+    parser.add_argument("--categories", nargs="+", default=config.ARXIV_CATEGORIES)
+    parser.add_argument("--since", type=date.fromisoformat, help="Earliest published date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Latest published date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=config.STREAM_BATCH_SIZE, help="Papers per micro-batch")
+    parser.add_argument("--skip", nargs="+", choices=STAGES, default=[])
+    args = parser.parse_args()
+
+    init_db()
+    if args.dump:
+        papers = filter_papers(iter_dump(args.dump), args.categories, since=args.since, until=args.until)
+        batches = dump_batches(papers, batch_size=args.batch_size)
+    else:
+        batches = harvest_batches()
+    run_streaming(batches, skip=args.skip)
+
+
+if __name__ == "__main__":
+    main()
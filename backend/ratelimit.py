@@ -0,0 +1,132 @@
+"""
+Rate limiting helpers shared by the agents
+"""
+from typing import Optional
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers block in acquire() until a token is
+    available, so any number of threads can share one request budget.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate  # Tokens added per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Take tokens, sleeping until they are available. Returns seconds waited.
+        With a timeout, raises TimeoutError without taking anything if the
+        tokens would not be available within timeout seconds.
+        """
+        with self._lock:
+            self._refill()
+            wait = (tokens - self._tokens) / self.rate if self._tokens < tokens else 0.0
+            if timeout is not None and wait > timeout:
+                raise TimeoutError(f"no token within {timeout:.1f}s (next in {wait:.1f}s)")
+            # Reserve the tokens now (possibly going negative) so waiting
+            # callers are served in arrival order
+            self._tokens -= tokens
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate: float):
+        """Change the refill rate; tokens accrued so far are kept"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """Hold back every caller for at least seconds, e.g. a server's Retry-After"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket whose rate follows the server: halved when requests are
+    throttled, set from the server's rate-limit hint when one is given, and
+    otherwise raised a little after every success (AIMD). Concurrent callers
+    throttled together only halve the rate once per decrease_interval.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, min_rate: float = 0.1,
+                 max_rate: float = 50.0, increase: float = 0.1, decrease_interval: float = 1.0):
+        super().__init__(rate, capacity)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_interval = decrease_interval
+        self._decreased = float("-inf")
+
+    def _clamp(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, rate))
+
+    def throttled(self, retry_after: Optional[float] = None):
+        """A request was rejected for exceeding the rate limit"""
+        now = time.monotonic()
+        if now - self._decreased >= max(self.decrease_interval, retry_after or 0.0):
+            self._decreased = now
+            self.set_rate(self._clamp(self.rate / 2))
+        if retry_after:
+            self.pause(retry_after)
+
+    def succeeded(self, rate_hint: Optional[float] = None):
+        """A request went through; rate_hint is the rate the server says it can take"""
+        if rate_hint is not None:
+            self.set_rate(self._clamp(rate_hint))
+        else:
+            self.set_rate(self._clamp(self.rate + self.increase))
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing service. After failure_threshold consecutive
+    failures the circuit opens and allow() refuses calls; after reset_timeout
+    seconds a single trial call is let through, whose outcome closes the
+    circuit again or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be made now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
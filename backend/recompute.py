@@ -0,0 +1,161 @@
+"""
+Historical trend recompute
+Rebuilds the trends rollup for a date range from the keywords and papers
+tables (by each paper's published week, as live runs count them), e.g.
+after a scoring change.
+
+Work is split into week shards across a process pool:
+  1. each shard counts its week's keywords (read-only)
+  2. the parent scores all weeks in one vectorized pass, with the stored
+     history before the range as context
+  3. each shard replaces its week's rows in a single transaction, so the
+     API keeps serving the old rows until the new ones are committed
+
+Usage:
+    python recompute.py --since 2024-01-01 --until 2025-12-31 --workers 8
+"""
+from typing import Dict, Any, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+import argparse
+import multiprocessing
+import time
+import numpy as np
+from sqlalchemy import select, delete, func
+from database import SessionLocal, Paper, Keyword, Trend, bulk_write
+from trends import week_of, load_frequency_matrix, score_matrix, rescore_trends
+import config
+
+
+def _count_week(week: date) -> Tuple[date, Dict[int, int]]:
+    """Keyword counts for papers published in the week starting at week"""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Keyword.keyword_id, func.count())
+            .join(Paper, Paper.id == Keyword.paper_id)
+            .where(Paper.published_date >= week, Paper.published_date < week + timedelta(days=7))
+            .group_by(Keyword.keyword_id)
+        ).all()
+        return week, dict(rows)
+    finally:
+        db.close()
+
+
+def _swap_week(shard: Tuple[date, List[Dict[str, Any]]]) -> Tuple[date, int]:
+    """Replace one week's trend rows atomically"""
+    week, rows = shard
+    db = SessionLocal()
+    try:
+        db.execute(delete(Trend).where(Trend.week_start == week))
+        bulk_write(db, Trend, rows)
+        db.commit()
+        return week, len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _score_range(weeks: List[date], counts: Dict[date, Dict[int, int]]) -> Dict[date, List[Dict[str, Any]]]:
+    """
+    Score the recomputed weeks, prefixed by the stored history that precedes
+    them so EMA, burst and decay see the same context as a live run.
+    Returns the trend rows to write for each week.
+    """
+    history_weeks = config.TREND_WINDOW_WEEKS - 1
+    db = SessionLocal()
+    try:
+        history_keys, history, _ = load_frequency_matrix(
+            db, weeks[0] - timedelta(weeks=history_weeks), weeks[0] - timedelta(weeks=1)
+        )
+    finally:
+        db.close()
+
+    keys = np.union1d(history_keys, np.fromiter(
+        {keyword_id for week_counts in counts.values() for keyword_id in week_counts}, dtype=np.int64
+    ))
+    frequency = np.zeros((len(keys), history_weeks + len(weeks)))
+    frequency[np.searchsorted(keys, history_keys), :history_weeks] = history
+    for column, week in enumerate(weeks, start=history_weeks):
+        week_counts = counts[week]
+        if week_counts:
+            rows = np.searchsorted(keys, np.fromiter(week_counts, dtype=np.int64))
+            frequency[rows, column] = list(week_counts.values())
+
+    scored = score_matrix(frequency)
+
+    shards = {}
+    for column, week in enumerate(weeks, start=history_weeks):
+        present = np.flatnonzero(frequency[:, column])
+        shards[week] = [
+            {
+                'keyword_id': int(keys[i]),
+                'week_start': week,
+                'frequency': int(frequency[i, column]),
+                'trending_score': float(scored['score'][i, column]),
+                'growth_rate': float(scored['growth'][i, column])
+            }
+            for i in present
+        ]
+    return shards
+
+
+def recompute_trends(since: date, until: date, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Rebuild trends for every week from since to until (inclusive), then
+    rescore any later weeks, whose scores depend on the rebuilt history.
+    """
+    first, last = week_of(since), week_of(until)
+    weeks = [first + timedelta(weeks=i) for i in range((last - first).days // 7 + 1)]
+    # No more processes than there are week shards
+    workers = max(1, min(workers or config.TREND_RECOMPUTE_WORKERS, len(weeks)))
+    started = time.monotonic()
+    print(f"📊 Recomputing trends for {len(weeks)} weeks ({first} to {last}) with {workers} workers...")
+
+    # Spawned, not forked: recompute is started from API background threads.
+    # Each worker imports database afresh, so it opens its own connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        counts = dict(pool.map(_count_week, weeks))
+        print(f"📊 Counted keywords for {len(counts)} weeks")
+
+        shards = _score_range(weeks, counts)
+
+        rows_written = 0
+        for week, written in pool.map(_swap_week, shards.items()):
+            rows_written += written
+        print(f"📊 Swapped in {rows_written} trend rows")
+
+    # Later weeks' EMA/burst/decay depend on the rebuilt history
+    current_week = week_of(date.today())
+    if last < current_week:
+        db = SessionLocal()
+        try:
+            rescore_trends(
+                db,
+                last_week=current_week,
+                weeks=(current_week - first).days // 7 + 1,
+                write_from=last + timedelta(weeks=1)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Trend recompute finished in {elapsed:.1f}s")
+    return {'weeks': len(weeks), 'rows': rows_written, 'seconds': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild trends for a date range")
+    parser.add_argument("--since", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today(), help="Last day (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=config.TREND_RECOMPUTE_WORKERS)
+    args = parser.parse_args()
+
+    recompute_trends(args.since, args.until, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Object storage for generated images (Cloudflare R2, or any S3-compatible
+endpoint such as MinIO via R2_ENDPOINT_URL)
+One S3 client per process, shared by all image workers: boto3 clients are
+thread-safe and keep a connection pool sized to IMAGE_WORKERS.
+
+Objects are stored under the SHA-256 of their bytes, so identical images are
+uploaded once. Downloads are streamed into a spooled temporary file (in
+memory up to IMAGE_MULTIPART_THRESHOLD, on disk beyond) while being hashed,
+and uploads switch to multipart for large files.
+"""
+from typing import Tuple
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+import hashlib
+import io
+import requests
+import config
+
+
+def storage_configured() -> bool:
+    return bool(config.R2_ACCOUNT_ID or config.R2_ENDPOINT_URL) and bool(
+        config.R2_ACCESS_KEY_ID and config.R2_SECRET_ACCESS_KEY and config.R2_BUCKET_NAME
+    )
+
+
+def _endpoint_url() -> str:
+    return config.R2_ENDPOINT_URL or f"https://{config.R2_ACCOUNT_ID}.r2.cloudflarestorage.com"
+
+
+@lru_cache(maxsize=None)
+def storage_client():
+    """Process-wide S3 client for the configured bucket"""
+    import boto3
+    from botocore.client import Config as BotoConfig
+
+    return boto3.client(
+        's3',
+        endpoint_url=_endpoint_url(),
+        aws_access_key_id=config.R2_ACCESS_KEY_ID,
+        aws_secret_access_key=config.R2_SECRET_ACCESS_KEY,
+        config=BotoConfig(signature_version='s3v4', max_pool_connections=config.IMAGE_WORKERS * 2),
+        region_name='auto'
+    )
+
+
+@lru_cache(maxsize=None)
+def _transfer_config():
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=config.IMAGE_MULTIPART_THRESHOLD,
+        multipart_chunksize=config.IMAGE_MULTIPART_THRESHOLD,
+        max_concurrency=4
+    )
+
+
+def public_url(key: str) -> str:
+    if config.R2_PUBLIC_URL:
+        return f"{config.R2_PUBLIC_URL}/{key}"
+    if config.R2_ENDPOINT_URL:
+        return f"{config.R2_ENDPOINT_URL}/{config.R2_BUCKET_NAME}/{key}"
+    return f"https://{config.R2_BUCKET_NAME}.{config.R2_ACCOUNT_ID}.r2.cloudflarestorage.com/{key}"
+
+
+def content_key(digest: str, extension: str) -> str:
+    return f"images/{digest}.{extension}"
+
+
+def _exists(key: str) -> bool:
+    from botocore.exceptions import ClientError
+
+    try:
+        storage_client().head_object(Bucket=config.R2_BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+
+
+def download(source_url: str) -> Tuple[SpooledTemporaryFile, str, str]:
+    """
+    Stream source_url into a spooled temporary file, hashing it on the way.
+    Returns the file (rewound), its SHA-256 hex digest and its content type.
+    Raises requests.HTTPError if the download fails.
+    """
+    digest = hashlib.sha256()
+    spool = SpooledTemporaryFile(max_size=config.IMAGE_MULTIPART_THRESHOLD)
+    try:
+        with requests.get(source_url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                digest.update(chunk)
+                spool.write(chunk)
+            content_type = response.headers.get('Content-Type', 'image/jpeg').split(';')[0]
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest(), content_type
+
+
+def store_file(fileobj, digest: str, extension: str, content_type: str) -> str:
+    """Upload fileobj under its content-hash key unless already stored; returns its public URL"""
+    key = content_key(digest, extension)
+    if not _exists(key):
+        storage_client().upload_fileobj(
+            fileobj,
+            config.R2_BUCKET_NAME,
+            key,
+            ExtraArgs={'ContentType': content_type, 'ACL': 'public-read'},
+            Config=_transfer_config()
+        )
+    return public_url(key)
+
+
+def store_bytes(data: bytes, extension: str) -> str:
+    """Upload an in-memory image under its content-hash key; returns its public URL"""
+    return store_file(io.BytesIO(data), hashlib.sha256(data).hexdigest(), extension, f"image/{extension}")
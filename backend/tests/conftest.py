@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A scratch SQLite file, shared by the threads a workflow or pipeline starts
+os.environ.setdefault("POSTGRES_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite3')}")
@@ -0,0 +1,65 @@
+import gzip
+import json
+from datetime import date
+from backfill import iter_dump
+from database import base_arxiv_id
+
+JSONL_RECORD = {
+    "id": "2401.01234",
+    "title": "Gaze Input\n  for Everyone",
+    "authors": "A. Author, B. Author",
+    "authors_parsed": [["Author", "Ada", ""], ["Author", "Bo", ""]],
+    "abstract": "  We study gaze\n input.  ",
+    "categories": "cs.HC cs.AI",
+    "update_date": "2024-03-01",
+    "versions": [
+        {"version": "v1", "created": "Tue, 2 Jan 2024 10:00:00 GMT"},
+        {"version": "v3", "created": "Fri, 1 Mar 2024 10:00:00 GMT"},
+    ],
+}
+
+OAI_DUMP = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+  <ListRecords>
+    <record>
+      <metadata>
+        <arXiv xmlns="http://arxiv.org/OAI/arXiv/">
+          <id>2401.01234</id>
+          <created>2024-01-02</created>
+          <authors>
+            <author><keyname>Author</keyname><forenames>Ada</forenames></author>
+          </authors>
+          <title>Gaze Input for Everyone</title>
+          <categories>cs.HC cs.AI</categories>
+          <abstract>We study gaze input.</abstract>
+        </arXiv>
+      </metadata>
+    </record>
+  </ListRecords>
+</OAI-PMH>
+"""
+
+
+def test_base_arxiv_id_strips_version():
+    assert base_arxiv_id("2401.01234v2") == "2401.01234"
+    assert base_arxiv_id("2401.01234") == "2401.01234"
+    assert base_arxiv_id("cs/0112017v1") == "cs/0112017"
+
+
+def test_jsonl_and_oai_dumps_yield_the_same_paper(tmp_path):
+    jsonl = tmp_path / "snapshot.json.gz"
+    with gzip.open(jsonl, "wt") as f:
+        f.write(json.dumps(JSONL_RECORD) + "\n\n")
+    oai = tmp_path / "records.xml"
+    oai.write_text(OAI_DUMP)
+
+    (from_jsonl,) = iter_dump([str(jsonl)])
+    (from_oai,) = iter_dump([str(oai)])
+
+    assert from_jsonl['arxiv_id'] == from_oai['arxiv_id'] == "2401.01234"
+    assert from_jsonl['published_date'] == from_oai['published_date'] == date(2024, 1, 2)
+    assert from_jsonl['title'] == from_oai['title'] == "Gaze Input for Everyone"
+    assert from_jsonl['abstract'] == "We study gaze input."
+    assert from_jsonl['authors'] == ["Ada Author", "Bo Author"]
+    assert from_oai['authors'] == ["Ada Author"]
+    assert from_jsonl['categories'] == ["cs.HC", "cs.AI"]
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete
+from database import engine, init_db, WorkflowRun, WorkflowCheckpoint
+from checkpoints import resumable_run
+import config
+
+
+@pytest.fixture
+def add_run():
+    init_db()
+
+    def add(run_id, status, attempts=1, idle=0.0, checkpointed=True):
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(WorkflowRun.__table__.insert().values(
+                id=run_id, status=status, attempts=attempts,
+                started_at=now - timedelta(seconds=idle), updated_at=now - timedelta(seconds=idle)
+            ))
+            if checkpointed:
+                conn.execute(WorkflowCheckpoint.__table__.insert().values(
+                    thread_id=run_id, checkpoint_ns="", checkpoint_id="1", checkpoint_type="json",
+                    checkpoint=b"{}", metadata_type="json", metadata=b"{}"
+                ))
+
+    yield add
+    with engine.begin() as conn:
+        conn.execute(delete(WorkflowRun))
+        conn.execute(delete(WorkflowCheckpoint))
+
+
+def test_failed_run_is_resumed(add_run):
+    add_run("failed", "failed")
+    assert resumable_run() == "failed"
+
+
+def test_running_run_with_a_fresh_heartbeat_is_left_alone(add_run):
+    add_run("elsewhere", "running", idle=config.WORKFLOW_STALE_SECONDS / 2)
+    assert resumable_run() is None
+
+
+def test_running_run_with_a_stale_heartbeat_is_resumed(add_run):
+    add_run("crashed", "running", idle=config.WORKFLOW_STALE_SECONDS + 1)
+    assert resumable_run() == "crashed"
+    assert resumable_run(exclude={"crashed"}) is None
+
+
+def test_run_is_given_up_after_max_attempts(add_run):
+    add_run("hopeless", "failed", attempts=config.WORKFLOW_MAX_ATTEMPTS)
+    assert resumable_run() is None
+
+
+def test_run_without_a_checkpoint_is_not_resumed(add_run):
+    add_run("early-crash", "failed", checkpointed=False)
+    assert resumable_run() is None
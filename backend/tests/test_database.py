@@ -0,0 +1,69 @@
+from datetime import date, datetime
+import pytest
+from sqlalchemy import delete, select
+from database import engine, init_db, SessionLocal, Trend, bulk_write, update_trend_scores, _CopyStream
+
+WEEK = date(2024, 3, 4)
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    yield session
+    session.close()
+    with engine.begin() as conn:
+        conn.execute(delete(Trend))
+
+
+def test_bulk_write_fills_in_column_defaults(db):
+    assert bulk_write(db, Trend, [
+        {'keyword_id': keyword_id, 'week_start': WEEK, 'frequency': 1, 'trending_score': 1.0}
+        for keyword_id in range(3)
+    ]) == 3
+    assert bulk_write(db, Trend, []) == 0
+    db.commit()
+
+    rows = db.execute(select(Trend.keyword_id, Trend.created_at)).all()
+    assert sorted(keyword_id for keyword_id, _ in rows) == [0, 1, 2]
+    assert all(isinstance(created_at, datetime) for _, created_at in rows)
+
+
+def test_update_trend_scores_only_touches_the_given_rows(db):
+    bulk_write(db, Trend, [
+        {'keyword_id': keyword_id, 'week_start': WEEK, 'frequency': 1, 'trending_score': 0.0, 'growth_rate': 0.0}
+        for keyword_id in range(3)
+    ])
+    ids = dict(db.execute(select(Trend.keyword_id, Trend.id)).all())
+
+    update_trend_scores(db, [
+        {'id': ids[0], 'trending_score': 2.5, 'growth_rate': 50.0},
+        {'id': ids[2], 'trending_score': 1.5, 'growth_rate': -10.0},
+    ])
+    update_trend_scores(db, [])
+    db.commit()
+
+    scores = {trend.keyword_id: (trend.trending_score, trend.growth_rate) for trend in db.scalars(select(Trend))}
+    assert scores == {0: (2.5, 50.0), 1: (0.0, 0.0), 2: (1.5, -10.0)}
+
+
+def test_copy_stream_renders_csv_across_reads():
+    rows = [
+        {'id': 1, 'title': 'Say "hi", HCI', 'score': 0.5, 'authors': ['A'], 'day': WEEK, 'note': None},
+        {'id': 2, 'title': '', 'score': 2, 'authors': [], 'day': WEEK, 'note': True},
+    ]
+    stream = _CopyStream(rows, ['id', 'title', 'score', 'authors', 'day', 'note'])
+
+    chunks = []
+    while True:
+        chunk = stream.read(7)
+        if not chunk:
+            break
+        assert len(chunk) <= 7
+        chunks.append(chunk)
+
+    # NULL is an empty field, an empty string is quoted
+    assert "".join(chunks) == (
+        '1,"Say ""hi"", HCI",0.5,"[""A""]","2024-03-04",\n'
+        '2,"",2,"[]","2024-03-04",true\n'
+    )
@@ -0,0 +1,68 @@
+import json
+import pytest
+import agents
+import grok
+from grok import GrokClient
+from llm_cache import ResponseCache
+
+PAPERS = [
+    {'arxiv_id': '2401.00001', 'title': 'Gaze typing', 'abstract': 'An eye tracking study.'},
+    {'arxiv_id': '2401.00002', 'title': 'Voice agents', 'abstract': 'A conversational agent study.'},
+]
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.text = json.dumps({'choices': [{'message': {'content': content}}]})
+
+    def json(self):
+        return json.loads(self.text)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """A client whose responses are queued in client.replies, cached in a scratch file"""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=1_000_000)
+    monkeypatch.setattr(grok, "response_cache", lambda: cache)
+    client = GrokClient("test-key", "http://grok.invalid", pool_size=1)
+    client.replies = []
+    client.session.post = lambda *args, **kwargs: FakeResponse(client.replies.pop(0))
+    monkeypatch.setattr(agents, "grok_client", lambda: client)
+    return client
+
+
+def batch_reply(*summaries):
+    return json.dumps({'summaries': [{'id': arxiv_id, 'summary': text} for arxiv_id, text in summaries]})
+
+
+def test_malformed_batch_response_is_not_cached(client):
+    client.replies = ["not json", batch_reply(('2401.00001', 'First.'), ('2401.00002', 'Second.'))]
+    with pytest.raises(ValueError):
+        agents._generate_batch_summaries(PAPERS)
+
+    # The retry asks the API again instead of replaying the bad response
+    assert agents._generate_batch_summaries(PAPERS) == {'2401.00001': 'First.', '2401.00002': 'Second.'}
+    assert client.replies == []
+
+
+def test_valid_batch_response_is_served_from_the_cache(client):
+    client.replies = [batch_reply(('2401.00001', 'First.'))]
+    assert agents._generate_batch_summaries(PAPERS) == {'2401.00001': 'First.'}
+    assert agents._generate_batch_summaries(PAPERS) == {'2401.00001': 'First.'}
+    assert grok.response_cache().stats()['hits'] == 1
+
+
+def test_cached_response_rejected_by_the_caller_is_replaced(client):
+    client.replies = ["cached", "fresh"]
+    messages = [{"role": "user", "content": "hello"}]
+    assert client.chat(messages) == "cached"
+
+    def reject_cached(content):
+        if content == "cached":
+            raise ValueError("stale")
+
+    assert client.chat(messages, validate=reject_cached) == "fresh"
+    assert client.chat(messages) == "fresh"
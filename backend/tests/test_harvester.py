@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import delete
+import agents
+import config
+import harvester
+from database import engine, init_db, SessionLocal, HarvestWatermark
+from harvester import fetch_category, harvest
+
+NOW = datetime(2024, 3, 8, 12, 0)
+
+
+def result(arxiv_id, hours_ago):
+    published = (NOW - timedelta(hours=hours_ago)).replace(tzinfo=timezone.utc)
+    return SimpleNamespace(
+        get_short_id=lambda: f"{arxiv_id}v1", title="t", authors=[SimpleNamespace(name="A")], summary="a",
+        categories=['cs.HC'], published=published, entry_id=f"http://arxiv.org/abs/{arxiv_id}v1", pdf_url="u"
+    )
+
+
+class FakeClient:
+    page_size = 2
+
+    def __init__(self, results):
+        self._results = results
+
+    def results(self, search):
+        return iter(self._results)
+
+
+def test_fetch_category_stops_at_the_watermark():
+    client = FakeClient([result('2403.00005', 1), result('2403.00004', 2), result('2403.00003', 3),
+                         result('2403.00002', 4), result('2403.00001', 5)])
+    events = []
+
+    fetch_category(client, 'cs.HC', (NOW - timedelta(hours=4), '2403.00002'), events.append)
+
+    assert [(kind, [p['arxiv_id'] for p in payload] if kind == 'page' else payload) for kind, _, payload in events] == [
+        ('page', ['2403.00005', '2403.00004']),
+        ('page', ['2403.00003']),
+        ('done', (NOW - timedelta(hours=1), '2403.00005')),
+    ]
+
+
+def test_fetch_category_without_new_papers_keeps_no_watermark():
+    events = []
+    fetch_category(FakeClient([result('2403.00001', 5)]), 'cs.HC', (NOW - timedelta(hours=5), '2403.00001'), events.append)
+    assert events == [('done', 'cs.HC', None)]
+
+
+def test_harvest_yields_cross_listed_papers_once(monkeypatch):
+    def fetch(client, category, stop_at, emit):
+        if category == 'cs.CY':
+            raise RuntimeError("feed unavailable")
+        emit(('page', category, [{'arxiv_id': '2403.00001'}, {'arxiv_id': f"{category}-only"}]))
+        emit(('done', category, None))
+
+    monkeypatch.setattr(harvester, 'fetch_category', fetch)
+    events = list(harvest({'cs.HC': None, 'cs.AI': None, 'cs.CY': None}))
+
+    pages = [[p['arxiv_id'] for p in payload] for kind, _, payload in events if kind == 'page']
+    assert sorted(sum(pages, [])) == ['2403.00001', 'cs.AI-only', 'cs.HC-only']
+    assert ('error', 'cs.CY', "feed unavailable") in events
+
+
+@pytest.fixture
+def watermarks(monkeypatch):
+    """Harvests fake events queued in watermarks['events'], recording the stop points"""
+    init_db()
+    monkeypatch.setattr(config, 'ARXIV_CATEGORIES', ['cs.HC', 'cs.AI'])
+    monkeypatch.setattr(agents, '_store_new_papers', lambda db, papers: papers)
+    recorded = {'events': [], 'stop_points': []}
+
+    def fake_harvest(stop_points):
+        recorded['stop_points'].append(stop_points)
+        return iter(recorded['events'])
+
+    monkeypatch.setattr(agents, 'harvest', fake_harvest)
+    yield recorded
+    with engine.begin() as conn:
+        conn.execute(delete(HarvestWatermark))
+
+
+def run_harvest():
+    db = SessionLocal()
+    try:
+        return list(agents._harvest_new_papers(db))
+    finally:
+        db.close()
+
+
+def test_watermarks_advance_only_for_finished_categories(watermarks):
+    newest = (NOW, '2403.00002')
+    watermarks['events'] = [
+        ('page', 'cs.HC', [{'arxiv_id': '2403.00002'}]),
+        ('done', 'cs.HC', newest),
+        ('page', 'cs.AI', [{'arxiv_id': '2403.00001'}]),
+        ('error', 'cs.AI', "timed out"),
+    ]
+    assert run_harvest() == [[{'arxiv_id': '2403.00002'}], [{'arxiv_id': '2403.00001'}]]
+    first_run = watermarks['stop_points'][0]
+    assert first_run['cs.HC'] == first_run['cs.AI']
+    assert first_run['cs.AI'][0] < datetime.utcnow() - timedelta(days=config.ARXIV_DAYS_BACK - 1)
+
+    watermarks['events'] = []
+    run_harvest()
+
+    # The failed category starts from the first-run stop point again
+    second_run = watermarks['stop_points'][1]
+    assert second_run['cs.HC'] == newest
+    assert second_run['cs.AI'][1] == ''
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete, select, update
+from database import engine, init_db, Job, Summary, SessionLocal, insert_summary
+from jobqueue import DatabaseQueue
+import config
+
+
+@pytest.fixture
+def queue():
+    init_db()
+    yield DatabaseQueue()
+    with engine.begin() as conn:
+        conn.execute(delete(Job))
+        conn.execute(delete(Summary))
+
+
+def expire_leases():
+    with engine.begin() as conn:
+        conn.execute(update(Job).values(visible_at=datetime.utcnow() - timedelta(seconds=1)))
+
+
+def job_row(key):
+    with engine.connect() as conn:
+        return conn.execute(select(Job).where(Job.job_key == key)).one()
+
+
+def test_enqueue_is_idempotent_while_queued(queue):
+    assert queue.enqueue('summary', [('1', {'paper_id': 1}), ('2', {'paper_id': 2})]) == 2
+    assert queue.enqueue('summary', [('1', {'paper_id': 1})]) == 0
+    assert [job['key'] for job in queue.claim('summary', 10)] == ['1', '2']
+    assert queue.claim('summary', 10) == []
+
+
+def test_stale_claim_cannot_complete_or_fail_the_job(queue):
+    queue.enqueue('summary', [('1', {'paper_id': 1})])
+    (first,) = queue.claim('summary', 1)
+    expire_leases()
+    (second,) = queue.claim('summary', 1)
+    assert second['attempts'] == first['attempts'] + 1
+
+    queue.complete(first)
+    queue.fail(first, "late")
+    assert job_row('1').status == 'running'
+
+    queue.complete(second)
+    assert job_row('1').status == 'done'
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue, monkeypatch):
+    monkeypatch.setattr(config, 'QUEUE_MAX_ATTEMPTS', 2)
+    queue.enqueue('summary', [('1', {'paper_id': 1})])
+    for attempt in (1, 2):
+        (job,) = queue.claim('summary', 1)
+        assert job['attempts'] == attempt
+        expire_leases()
+
+    assert queue.claim('summary', 1) == []
+    assert job_row('1').status == 'failed'
+    assert queue.stats()['summary'] == {'failed': 1}
+
+
+def test_extend_keeps_a_running_job_leased(queue):
+    queue.enqueue('image', [('1', {'paper_id': 1})])
+    (job,) = queue.claim('image', 1)
+    expire_leases()
+    queue.extend([job])
+    assert queue.claim('image', 1) == []
+
+
+def test_one_summary_per_paper(queue):
+    db = SessionLocal()
+    try:
+        row = {'paper_id': 1, 'summary_text': "text", 'word_count': 1, 'difficulty_level': 'undergraduate'}
+        assert insert_summary(db, row) is True
+        assert insert_summary(db, dict(row, summary_text="again")) is False
+        db.commit()
+        assert db.query(Summary).count() == 1
+    finally:
+        db.close()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from keywords import TermMatcher, build_term_matrix, build_term_matrix_parallel, domain_matcher
+
+
+def test_terms_match_whole_words_only():
+    matcher = TermMatcher(["bias", "iot"])
+    assert matcher.find("Algorithmic bias in hiring") == {"bias"}
+    assert matcher.find("A biased sample") == set()
+    assert matcher.find("IoT devices at home") == {"iot"}
+    assert matcher.find("Do not be an idiot") == set()
+
+
+def test_multi_word_and_hyphenated_terms():
+    matcher = TermMatcher(["human-computer interaction", "machine learning"])
+    assert matcher.find("Human computer interaction studies") == {"human-computer interaction"}
+    assert matcher.find("human-computer interaction") == {"human-computer interaction"}
+    assert matcher.find("a machine that is learning") == set()
+
+
+def test_plural_matches_singular_term():
+    matcher = TermMatcher(["transformer", "bias"])
+    assert matcher.find("Vision transformers") == {"transformer"}
+    # Short tokens are not treated as plurals
+    assert matcher.find("a bus") == set()
+
+
+def test_overlapping_terms_are_all_found():
+    matcher = TermMatcher(["language model", "large language model"])
+    assert matcher.find("a large language model") == {"language model", "large language model"}
+
+
+ABSTRACTS = [
+    "We study machine learning for user interface design with deep learning models.",
+    "Accessibility of virtual reality interfaces for older adults: a user study.",
+    "Biased datasets and algorithmic bias in large language model evaluation.",
+    "Federated learning on IoT devices preserves privacy of user behavior data.",
+    "Conversational agents and chatbots support mental health; users trust agents.",
+    "",
+    "Eye tracking and gaze interaction in augmented reality headsets; gaze gaze gaze.",
+]
+
+
+@pytest.mark.parametrize("matcher", [
+    domain_matcher(),
+    # Not the configured vocabulary: workers must use the caller's terms
+    TermMatcher(["gaze interaction", "mental health", "privacy-preserving"]),
+], ids=["domain", "custom"])
+def test_parallel_term_matrix_matches_single_process(matcher):
+    matrix, terms = build_term_matrix(ABSTRACTS, matcher)
+    parallel_matrix, parallel_terms = build_term_matrix_parallel(ABSTRACTS, matcher, workers=2, chunk_size=3)
+
+    assert parallel_terms == terms
+    assert parallel_matrix.shape == matrix.shape
+    assert (parallel_matrix != matrix).nnz == 0
+    np.testing.assert_array_equal(parallel_matrix.indptr, matrix.indptr)
@@ -0,0 +1,34 @@
+import sqlite3
+from llm_cache import ResponseCache
+
+
+def stored_bytes(path):
+    return sqlite3.connect(path).execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+def test_running_total_tracks_puts_replaces_discards_and_evictions(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path, max_bytes=1000)
+    for i in range(30):
+        cache.put(str(i), "x" * 100)
+    cache.put("29", "y" * 50)
+    cache.discard("28")
+    cache.discard("missing")
+
+    stats = cache.stats()
+    assert stats['bytes'] == stored_bytes(path)
+    assert stats['bytes'] <= 1000
+    assert stats['evictions'] > 0
+    assert cache.get("0") is None
+    assert cache.get("29") == "y" * 50
+
+
+def test_total_is_initialised_from_an_existing_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path, max_bytes=10_000)
+    cache.put("a", "x" * 10)
+    cache.put("b", "x" * 20)
+    # A cache file written before the running total existed
+    cache._conn.execute("DELETE FROM counters WHERE name = 'bytes'")
+
+    assert ResponseCache(path, max_bytes=10_000).stats()['bytes'] == 30
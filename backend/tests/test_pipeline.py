@@ -0,0 +1,46 @@
+from datetime import date
+import pytest
+import pipeline
+import config
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Keyword stage stub that fails on the batches listed in fail_on; summaries are skipped"""
+    monkeypatch.setattr(config, 'GROK_API_KEY', None)
+    monkeypatch.setattr(config, 'QUEUE_BACKEND', "")
+    recorded = {'fail_on': set(), 'batches': 0, 'trends': []}
+
+    def store_keywords(db, papers):
+        recorded['batches'] += 1
+        if recorded['batches'] in recorded['fail_on']:
+            raise RuntimeError("keyword store failed")
+        return [{'paper_id': paper['id'], 'keyword': 'gaze'} for paper in papers]
+
+    def update_trends(db, counts):
+        recorded['trends'].append(dict(counts))
+        return {keyword for _, keyword in counts}
+
+    monkeypatch.setattr(pipeline, '_store_keywords', store_keywords)
+    monkeypatch.setattr(pipeline, '_update_trends', update_trends)
+    return recorded
+
+
+def batch(first_id, published):
+    return [{'id': first_id + i, 'arxiv_id': str(first_id + i), 'published_date': published} for i in range(2)]
+
+
+def test_keywords_are_counted_in_their_published_week(stages):
+    stats = pipeline.run_streaming([batch(1, date(2019, 1, 9)), batch(3, date(2023, 5, 3))])
+
+    assert stats['papers'] == 4
+    assert stages['trends'] == [{(date(2019, 1, 7), 'gaze'): 2, (date(2023, 5, 1), 'gaze'): 2}]
+
+
+def test_stored_keywords_are_rolled_up_when_a_stage_fails(stages):
+    stages['fail_on'].add(2)
+
+    with pytest.raises(RuntimeError, match="keyword store failed"):
+        pipeline.run_streaming([batch(1, date(2024, 3, 6)), batch(3, date(2024, 3, 6)), batch(5, date(2024, 3, 6))])
+
+    assert stages['trends'] == [{(date(2024, 3, 4), 'gaze'): 2}]
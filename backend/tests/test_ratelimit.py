@@ -0,0 +1,17 @@
+import pytest
+from ratelimit import TokenBucket
+
+
+def test_acquire_times_out_without_taking_a_token():
+    bucket = TokenBucket(rate=0.1, capacity=1.0)
+    assert bucket.acquire(timeout=0) == 0.0
+    with pytest.raises(TimeoutError):
+        bucket.acquire(timeout=1.0)
+    # The refused call reserved nothing
+    assert bucket._tokens == pytest.approx(0.0, abs=0.01)
+
+
+def test_acquire_waits_when_the_token_arrives_in_time():
+    bucket = TokenBucket(rate=50.0, capacity=1.0)
+    bucket.acquire()
+    assert 0 < bucket.acquire(timeout=1.0) <= 0.03
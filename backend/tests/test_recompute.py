@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from sqlalchemy import delete, select
+from database import engine, init_db, SessionLocal, Paper, Keyword, Trend, bulk_write
+from recompute import _swap_week, recompute_trends
+from trends import week_of, score_matrix
+
+WEEK = date(2024, 3, 4)
+
+
+@pytest.fixture
+def tables():
+    init_db()
+    yield
+    with engine.begin() as conn:
+        for model in (Keyword, Paper, Trend):
+            conn.execute(delete(model))
+
+
+def add_trends(*rows):
+    db = SessionLocal()
+    bulk_write(db, Trend, [
+        {'keyword_id': keyword_id, 'week_start': week, 'frequency': frequency, 'trending_score': 0.0}
+        for keyword_id, week, frequency in rows
+    ])
+    db.commit()
+    db.close()
+
+
+def add_papers(published, keyword_ids):
+    """One paper per keyword id, all published on the same day"""
+    db = SessionLocal()
+    for keyword_id in keyword_ids:
+        paper = Paper(arxiv_id=f"{published:%y%m}.{keyword_id:05d}", title="t", authors=[], abstract="a",
+                      arxiv_categories=[], published_date=published, arxiv_url="u", pdf_url="u")
+        db.add(paper)
+        db.flush()
+        db.add(Keyword(paper_id=paper.id, keyword_id=keyword_id, source='extracted'))
+    db.commit()
+    db.close()
+
+
+def stored(week=None):
+    query = select(Trend.keyword_id, Trend.week_start, Trend.frequency, Trend.trending_score)
+    if week is not None:
+        query = query.where(Trend.week_start == week)
+    with engine.connect() as conn:
+        return {(row.keyword_id, row.week_start): row for row in conn.execute(query)}
+
+
+def test_swap_week_replaces_only_that_week(tables):
+    add_trends((1, WEEK, 5), (2, WEEK, 3), (1, WEEK + timedelta(weeks=1), 7))
+
+    assert _swap_week((WEEK, [
+        {'keyword_id': 3, 'week_start': WEEK, 'frequency': 2, 'trending_score': 2.0, 'growth_rate': 0.0}
+    ])) == (WEEK, 1)
+
+    rows = stored()
+    assert set(rows) == {(3, WEEK), (1, WEEK + timedelta(weeks=1))}
+    assert rows[(1, WEEK + timedelta(weeks=1))].frequency == 7
+
+
+def test_failed_swap_keeps_the_old_rows(tables):
+    add_trends((1, WEEK, 5))
+    duplicate = {'keyword_id': 2, 'week_start': WEEK, 'frequency': 1, 'trending_score': 1.0}
+
+    with pytest.raises(Exception):
+        _swap_week((WEEK, [duplicate, duplicate]))
+
+    assert set(stored()) == {(1, WEEK)}
+
+
+def test_later_weeks_are_rescored_against_the_rebuilt_history(tables):
+    current = week_of(date.today())
+    rebuilt, later = current - timedelta(weeks=3), current - timedelta(weeks=1)
+    add_papers(rebuilt, [1, 2, 3])
+    # Keyword 1 was miscounted in the rebuilt week; its later row is stale too
+    add_trends((1, rebuilt, 9), (1, later, 4))
+
+    result = recompute_trends(rebuilt, rebuilt + timedelta(days=6), workers=2)
+
+    assert result['weeks'] == 1 and result['rows'] == 3
+    rows = stored()
+    assert rows[(1, rebuilt)].frequency == 1
+    # Scored as if the later week had always followed the rebuilt one
+    expected = score_matrix(np.array([[1.0, 0.0, 4.0, 0.0]]))['score'][0, 2]
+    assert rows[(1, later)].trending_score == pytest.approx(expected)
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import delete, select
+from database import engine, init_db, WorkflowRun, WorkflowStage, WorkflowCheckpoint, WorkflowCheckpointWrite
+import agents
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace every agent with a stub that records its calls; fail_once names agents that fail on their first call"""
+    init_db()
+    calls = {'fail_once': set()}
+
+    def stub(name, **updates):
+        def agent(state):
+            calls[name] = calls.get(name, 0) + 1
+            if name in calls['fail_once']:
+                calls['fail_once'].discard(name)
+                raise RuntimeError(f"{name} failed")
+            state.update(updates)
+            return state
+        agent.__name__ = name
+        return agent
+
+    monkeypatch.setattr(agents, 'arxiv_search_agent', stub('arxiv_search_agent', papers=[{'id': 1}]))
+    monkeypatch.setattr(agents, 'keyword_extraction_agent', stub('keyword_extraction_agent', keywords=[{'keyword': 'gaze'}]))
+    monkeypatch.setattr(agents, 'trend_analysis_agent', stub('trend_analysis_agent', trends={'gaze': {}}))
+    monkeypatch.setattr(agents, 'summary_generation_agent', stub('summary_generation_agent', summaries=[]))
+    monkeypatch.setattr(agents, 'image_creation_agent', stub('image_creation_agent', images=[]))
+    yield calls
+    with engine.begin() as conn:
+        for table in (WorkflowRun, WorkflowStage, WorkflowCheckpoint, WorkflowCheckpointWrite):
+            conn.execute(delete(table))
+
+
+def run_row(run_id):
+    with engine.connect() as conn:
+        return conn.execute(select(WorkflowRun).where(WorkflowRun.id == run_id)).one()
+
+
+def test_failed_run_resumes_at_the_unfinished_node(calls):
+    calls['fail_once'].add('trend_analysis_agent')
+    with pytest.raises(Exception):
+        agents.run_workflow()
+    with engine.connect() as conn:
+        failed_id = conn.execute(select(WorkflowRun.id)).scalar_one()
+    assert run_row(failed_id).status == 'failed'
+
+    result = agents.run_workflow()
+    assert result['run_id'] == failed_id
+    assert result['trends'] == {'gaze': {}}
+    assert calls['arxiv_search_agent'] == 1
+    assert calls['trend_analysis_agent'] == 2
+    assert run_row(failed_id).status == 'completed'
+    assert run_row(failed_id).attempts == 2
+
+
+def test_completed_or_unknown_run_id_is_rejected(calls):
+    run_id = agents.run_workflow()['run_id']
+
+    with pytest.raises(agents.UnknownRunError):
+        agents.run_workflow(run_id=run_id)
+    with pytest.raises(agents.UnknownRunError):
+        agents.run_workflow(run_id="no-such-run")
+    assert run_row(run_id).status == 'completed'
+    assert calls['arxiv_search_agent'] == 1
+
+
+def test_run_without_a_checkpoint_is_not_resumed_but_can_be_rerun(calls):
+    with engine.begin() as conn:
+        conn.execute(WorkflowRun.__table__.insert().values(id="early", status='failed', attempts=1))
+
+    # A default trigger starts a fresh run instead of the run with nothing to resume
+    fresh_id = agents.run_workflow()['run_id']
+    assert fresh_id != "early"
+    assert run_row("early").status == 'failed'
+
+    # Naming the run starts it over under its own id
+    assert agents.run_workflow(run_id="early")['run_id'] == "early"
+    assert run_row("early").status == 'completed'
+    assert run_row("early").attempts == 2
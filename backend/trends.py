@@ -0,0 +1,161 @@
+"""
+NumPy time-series engine for trend scoring
+Loads the keyword x week frequency matrix from the trends rollup in one
+query and scores every keyword and week in a single vectorized pass:
+EMA-smoothed growth, z-score bursts and a decay-weighted trending score.
+
+Usage:
+    python trends.py            # rescore the last TREND_WINDOW_WEEKS weeks
+    python trends.py --weeks 52
+"""
+from typing import Dict, Any, Iterable, Optional, Tuple
+from datetime import date, timedelta
+import argparse
+import time
+import numpy as np
+from scipy.signal import lfilter
+from sqlalchemy import select
+from database import SessionLocal, Trend, update_trend_scores
+import config
+
+
+def week_of(day: date) -> date:
+    """Monday of the week containing day"""
+    return day - timedelta(days=day.weekday())
+
+
+def load_frequency_matrix(db, first_week: date, last_week: date,
+                          keyword_ids: Optional[Iterable[int]] = None
+                          ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Dense (keywords x weeks) frequency matrix for [first_week, last_week].
+    Returns the keyword ids (row labels), the frequencies, and the trend row
+    ids for each cell (0 where a keyword has no row that week).
+    """
+    query = select(Trend.id, Trend.keyword_id, Trend.week_start, Trend.frequency).where(
+        Trend.week_start >= first_week, Trend.week_start <= last_week
+    )
+    if keyword_ids is not None:
+        query = query.where(Trend.keyword_id.in_(list(keyword_ids)))
+    rows = db.execute(query).all()
+
+    weeks = (last_week - first_week).days // 7 + 1
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, weeks)), np.zeros((0, weeks), dtype=np.int64)
+
+    trend_ids, keyword_col, week_starts, frequencies = zip(*rows)
+    keys, row_index = np.unique(np.array(keyword_col, dtype=np.int64), return_inverse=True)
+    week_index = (np.array(week_starts, dtype="datetime64[D]") - np.datetime64(first_week, "D")).astype(np.int64) // 7
+
+    frequency = np.zeros((len(keys), weeks))
+    cell_ids = np.zeros((len(keys), weeks), dtype=np.int64)
+    frequency[row_index, week_index] = frequencies
+    cell_ids[row_index, week_index] = trend_ids
+    return keys, frequency, cell_ids
+
+
+def score_matrix(frequency: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Score every (keyword, week) cell at once. Each output has the same shape
+    as frequency and only looks at the current and earlier weeks:
+      ema       - exponential moving average (TREND_EMA_ALPHA)
+      growth    - week-over-week % change of the EMA
+      burst     - z-score of the week against the previous TREND_BURST_WINDOW weeks
+      decayed   - sum of past frequencies weighted by TREND_DECAY ** age
+      score     - decayed, boosted by positive bursts (TREND_BURST_WEIGHT,
+                  capped at TREND_BURST_CAP deviations)
+    """
+    alpha = config.TREND_EMA_ALPHA
+    window = config.TREND_BURST_WINDOW
+    keywords, weeks = frequency.shape
+
+    # ema[t] = alpha * f[t] + (1 - alpha) * ema[t-1], as a linear filter along weeks
+    ema = lfilter([alpha], [1.0, alpha - 1.0], frequency, axis=1)
+    previous = np.hstack([np.zeros((keywords, 1)), ema[:, :-1]])
+    # Growth is measured against at least one paper, so a keyword whose EMA has
+    # decayed towards zero does not report a huge percentage on its return
+    growth = np.where(previous > 0, (ema - previous) * 100.0 / np.maximum(previous, 1.0), 0.0)
+
+    # Trailing-window mean/variance from cumulative sums (excluding the current week)
+    padded = np.hstack([np.zeros((keywords, 1)), frequency])
+    sums = np.cumsum(padded, axis=1)
+    squares = np.cumsum(padded ** 2, axis=1)
+    ends = np.arange(weeks)
+    starts = np.maximum(ends - window, 0)
+    counts = (ends - starts).astype(np.float64)
+    window_sum = sums[:, ends] - sums[:, starts]
+    window_squares = squares[:, ends] - squares[:, starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(counts > 0, window_sum / counts, 0.0)
+        variance = np.where(counts > 0, window_squares / counts, 0.0) - mean ** 2
+    # Floor the deviation at the Poisson noise level (and 1) so a keyword going
+    # from 0 to 1 paper is not an infinite burst
+    deviation = np.maximum(np.sqrt(np.maximum(variance, 0.0)), np.sqrt(mean)).clip(min=1.0)
+    burst = np.where(counts >= 2, (frequency - mean) / deviation, 0.0)
+
+    # decayed[t] = f[t] + decay * decayed[t-1]
+    decayed = lfilter([1.0], [1.0, -config.TREND_DECAY], frequency, axis=1)
+    score = decayed * (1.0 + config.TREND_BURST_WEIGHT * np.clip(burst, 0.0, config.TREND_BURST_CAP))
+
+    return {'ema': ema, 'growth': growth, 'burst': burst, 'decayed': decayed, 'score': score}
+
+
+def rescore_trends(db, last_week: Optional[date] = None, weeks: Optional[int] = None,
+                   keyword_ids: Optional[Iterable[int]] = None,
+                   write_from: Optional[date] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Rescore trend rows over the last `weeks` weeks ending at last_week and
+    write trending_score/growth_rate back in bulk. Only rows on or after
+    write_from are written (default: the whole window). Returns the scores
+    of last_week for each keyword, keyed by keyword_id.
+    """
+    last_week = week_of(last_week or date.today())
+    weeks = weeks or config.TREND_WINDOW_WEEKS
+    first_week = last_week - timedelta(weeks=weeks - 1)
+
+    keys, frequency, cell_ids = load_frequency_matrix(db, first_week, last_week, keyword_ids)
+    if not len(keys):
+        return {}
+    scored = score_matrix(frequency)
+
+    first_column = 0
+    if write_from is not None:
+        first_column = max(0, (week_of(write_from) - first_week).days // 7)
+    cells = np.nonzero(cell_ids[:, first_column:])
+    rows, cols = cells[0], cells[1] + first_column
+    update_trend_scores(db, [
+        {'id': int(trend_id), 'trending_score': float(score), 'growth_rate': float(growth)}
+        for trend_id, score, growth in zip(
+            cell_ids[rows, cols], scored['score'][rows, cols], scored['growth'][rows, cols]
+        )
+    ])
+
+    return {
+        int(keyword_id): {
+            'frequency': int(frequency[i, -1]),
+            'trending_score': float(scored['score'][i, -1]),
+            'growth_rate': float(scored['growth'][i, -1]),
+            'burst': float(scored['burst'][i, -1])
+        }
+        for i, keyword_id in enumerate(keys)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore keyword trends")
+    parser.add_argument("--weeks", type=int, default=config.TREND_WINDOW_WEEKS)
+    parser.add_argument("--until", type=date.fromisoformat, help="Last week to score (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        current = rescore_trends(db, last_week=args.until, weeks=args.weeks)
+        db.commit()
+        print(f"✅ Rescored {len(current)} keywords over {args.weeks} weeks in {time.monotonic() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
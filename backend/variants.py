@@ -0,0 +1,58 @@
+"""
+Image variants for paper cards
+Decodes a generated image once and re-encodes it as a small thumbnail and
+full-size WebP/AVIF copies. Encoding is CPU-bound, so it runs in a process
+pool shared by the image workers. Pillow is optional: without it (or
+without an AVIF encoder) the missing variants are simply skipped.
+"""
+from typing import Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import io
+import multiprocessing
+import config
+
+# name -> (format, max width or None for full size)
+VARIANTS = {
+    'thumbnail': ('webp', config.IMAGE_THUMBNAIL_WIDTH),
+    'webp': ('webp', None),
+    'avif': ('avif', None),
+}
+
+
+def variants_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def make_variants(data: bytes) -> Dict[str, Tuple[bytes, str]]:
+    """Encode every variant the installed Pillow supports; returns name -> (bytes, extension)"""
+    from PIL import Image
+
+    supported = Image.registered_extensions()
+    variants = {}
+    with Image.open(io.BytesIO(data)) as source:
+        image = source.convert("RGB")
+
+    for name, (extension, width) in VARIANTS.items():
+        if f".{extension}" not in supported:
+            continue
+        resized = image
+        if width and image.width > width:
+            resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, format=supported[f".{extension}"], quality=config.IMAGE_VARIANT_QUALITY)
+        variants[name] = (buffer.getvalue(), extension)
+    return variants
+
+
+@lru_cache(maxsize=None)
+def variant_pool() -> ProcessPoolExecutor:
+    """Process pool for encoding; spawned, since it is started from worker threads"""
+    return ProcessPoolExecutor(
+        max_workers=config.IMAGE_VARIANT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
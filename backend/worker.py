@@ -0,0 +1,146 @@
+"""
+Queue worker for summary and image jobs
+With QUEUE_BACKEND set, the summary and image agents only enqueue one job per
+paper; any number of these worker processes (on any machine sharing the
+queue and database) claim and run them. Each claimed job is leased for
+QUEUE_VISIBILITY_TIMEOUT seconds and renewed while it runs, so only jobs of
+a crashed worker are picked up by another one, and a finished summary job queues the image job for its paper.
+
+Usage:
+    QUEUE_BACKEND=redis python worker.py
+    QUEUE_BACKEND=database python worker.py --kinds summary --once
+"""
+from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, wait
+import argparse
+import signal
+import threading
+from database import SessionLocal, init_db, summary_backlog, image_backlog
+from agents import _summarize_papers, _store_summary, _create_image, _store_image
+from jobqueue import job_queue, JOB_KINDS
+import config
+
+stopping = threading.Event()
+
+
+def run_summary_jobs(queue, jobs: List[Dict[str, Any]]):
+    """Summarize the papers of a batch of claimed jobs in one request"""
+    db = SessionLocal()
+    try:
+        paper_ids = [job['payload']['paper_id'] for job in jobs]
+        # Papers summarized since the job was queued (or deleted) need no work
+        papers = {paper['id']: paper for paper in summary_backlog(db, len(paper_ids), paper_ids=paper_ids)}
+        results = {paper['id']: (text, error) for paper, text, error in _summarize_papers(list(papers.values()))}
+
+        for job in jobs:
+            paper_id = job['payload']['paper_id']
+            if paper_id not in results:
+                queue.complete(job)
+                continue
+            summary_text, error = results[paper_id]
+            if error is not None:
+                print(f"⚠️  Summary job for paper {papers[paper_id]['arxiv_id']} failed "
+                      f"(attempt {job['attempts']}): {error}")
+                queue.fail(job, error)
+                continue
+            stored = _store_summary(db, papers[paper_id], summary_text)
+            queue.complete(job)
+            if stored is None:
+                # Another claim of this job stored the summary first
+                continue
+            queue.enqueue('image', [(str(paper_id), {'paper_id': paper_id})])
+            print(f"✅ Generated summary for paper {papers[paper_id]['arxiv_id']}")
+    finally:
+        db.close()
+
+
+def run_image_job(queue, job: Dict[str, Any]):
+    """Generate and store the image for one claimed job"""
+    db = SessionLocal()
+    try:
+        items = image_backlog(db, 1, paper_ids=[job['payload']['paper_id']])
+        if not items:
+            queue.complete(job)
+            return
+        item = items[0]
+        try:
+            image_url, variant_urls, _ = _create_image(item)
+        except Exception as e:
+            print(f"⚠️  Image job for paper {item['arxiv_id']} failed (attempt {job['attempts']}): {str(e)}")
+            queue.fail(job, str(e))
+            return
+        if image_url is not None:
+            _store_image(db, item, image_url, variant_urls)
+            print(f"✅ Stored image for paper {item['arxiv_id']}: {image_url}")
+        queue.complete(job)
+    finally:
+        db.close()
+
+
+def work(kinds: List[str], once: bool = False) -> int:
+    """
+    Claim and run jobs until stopped, or until the queue is empty with once.
+    Each round claims enough jobs to fill the summary and image thread pools
+    and waits for them, renewing the leases of unfinished jobs every third of
+    QUEUE_VISIBILITY_TIMEOUT, since one summary batch with its per-paper
+    fallbacks can run for several GROK_DEADLINEs.
+    Returns the number of jobs processed.
+    """
+    queue = job_queue()
+    if queue is None:
+        raise SystemExit("QUEUE_BACKEND is not set; summaries and images run inline in the agents")
+
+    batch_size = max(1, config.SUMMARY_BATCH_SIZE)
+    processed = 0
+    print(f"👷 Worker for {', '.join(kinds)} jobs on the {config.QUEUE_BACKEND} queue")
+    with ThreadPoolExecutor(max_workers=config.GROK_CONCURRENCY) as summaries, \
+            ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS) as images:
+        while not stopping.is_set():
+            # Future -> the jobs it runs
+            futures = {}
+            if 'summary' in kinds:
+                jobs = queue.claim('summary', config.GROK_CONCURRENCY * batch_size)
+                for i in range(0, len(jobs), batch_size):
+                    futures[summaries.submit(run_summary_jobs, queue, jobs[i:i + batch_size])] = jobs[i:i + batch_size]
+                processed += len(jobs)
+            if 'image' in kinds:
+                jobs = queue.claim('image', config.IMAGE_WORKERS)
+                for job in jobs:
+                    futures[images.submit(run_image_job, queue, job)] = [job]
+                processed += len(jobs)
+
+            if not futures:
+                if once:
+                    break
+                stopping.wait(config.QUEUE_POLL_INTERVAL)
+                continue
+            running = set(futures)
+            while running:
+                done, running = wait(running, timeout=config.QUEUE_VISIBILITY_TIMEOUT / 3)
+                for future in done:
+                    if future.exception() is not None:
+                        # The job stays leased and is retried once its lease expires
+                        print(f"❌ Worker error: {future.exception()}")
+                if running:
+                    queue.extend(job for future in running for job in futures[future])
+
+    print(f"👷 Worker stopped after {processed} jobs")
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued summary and image jobs")
+    parser.add_argument("--kinds", nargs="+", choices=JOB_KINDS, default=list(JOB_KINDS))
+    parser.add_argument("--once", action="store_true", help="Exit when no job is due instead of polling")
+    args = parser.parse_args()
+
+    # Finish the current round of jobs, then exit
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    init_db()
+    work(args.kinds, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ export interface Paper {
 export interface Keyword {
   id: number;
   paper_id: number;
-  keyword: string;
+  keyword_id: number;
   source: string;
   confidence: number;
   category?: string;
@@ -30,6 +30,7 @@ export interface Summary {
   word_count: number;
   difficulty_level?: string;
   generated_image_url?: string;
+  image_variants?: Record<string, string>;
   created_at: string;
 }
 
@@ -61,11 +62,18 @@ export async function createTables() {
       );
     `;
 
+    await sql`
+      CREATE TABLE IF NOT EXISTS keyword_vocab (
+        id SERIAL PRIMARY KEY,
+        term VARCHAR(100) UNIQUE NOT NULL
+      );
+    `;
+
     await sql`
       CREATE TABLE IF NOT EXISTS keywords (
         id SERIAL PRIMARY KEY,
         paper_id INTEGER REFERENCES papers(id),
-        keyword VARCHAR(100) NOT NULL,
+        keyword_id INTEGER NOT NULL REFERENCES keyword_vocab(id),
         source VARCHAR(20) NOT NULL,
         confidence FLOAT DEFAULT 1.0,
         category VARCHAR(50),
@@ -80,7 +88,8 @@ export async function createTables() {
         summary_text TEXT NOT NULL,
         word_count INTEGER NOT NULL,
         difficulty_level VARCHAR(20),
-        generated_image_url VARCHAR(255),
+        generated_image_url TEXT,
+        image_variants JSONB,
         created_at TIMESTAMP DEFAULT NOW()
       );
     `;
@@ -88,12 +97,13 @@ export async function createTables() {
     await sql`
       CREATE TABLE IF NOT EXISTS trends (
         id SERIAL PRIMARY KEY,
-        keyword VARCHAR(100) NOT NULL,
+        keyword_id INTEGER NOT NULL REFERENCES keyword_vocab(id),
         week_start DATE NOT NULL,
         frequency INTEGER NOT NULL,
         trending_score FLOAT NOT NULL,
         growth_rate FLOAT,
-        created_at TIMESTAMP DEFAULT NOW()
+        created_at TIMESTAMP DEFAULT NOW(),
+        CONSTRAINT uq_trends_keyword_week UNIQUE (keyword_id, week_start)
       );
     `;
 
@@ -121,9 +131,11 @@ export async function getRecentPapers(limit: number = 10): Promise<Paper[]> {
 export async function getTrendingKeywords(limit: number = 20): Promise<Trend[]> {
   try {
     const result = await sql`
-      SELECT * FROM trends
-      WHERE week_start >= CURRENT_DATE - INTERVAL '30 days'
-      ORDER BY trending_score DESC
+      SELECT t.*, v.term AS keyword
+      FROM trends t
+      JOIN keyword_vocab v ON v.id = t.keyword_id
+      WHERE t.week_start >= CURRENT_DATE - INTERVAL '30 days'
+      ORDER BY t.trending_score DESC
       LIMIT ${limit}
     `;
     return result.rows as Trend[];
@@ -143,7 +155,8 @@ export async function searchPapers(query: string): Promise<Paper[]> {
          OR p.abstract ILIKE ${'%' + query + '%'}
          OR EXISTS (
            SELECT 1 FROM keywords k
-           WHERE k.paper_id = p.id AND k.keyword ILIKE ${'%' + query + '%'}
+           JOIN keyword_vocab v ON v.id = k.keyword_id
+           WHERE k.paper_id = p.id AND v.term ILIKE ${'%' + query + '%'}
          )
       ORDER BY p.published_date DESC
       LIMIT 50